@@ -1,254 +1,141 @@
-from flask import Flask, render_template, request, redirect, url_for, session
-import pandas as pd
-from scipy.cluster.hierarchy import linkage, fcluster
-import random
-import numpy as np
-import webbrowser
+from flask import Flask, Response, render_template, request, redirect, url_for, session, jsonify, make_response, current_app
+import os
+import threading
+import uuid
+from functools import partial
+import logging
+from ranking_engine import EmployeeRanking, PAIRING_STRATEGIES, RANKING_MODES
+from storage import LRUCache, create_backend
+from journal import VoteJournal
+import instrumentation
+from instrumentation import timed_render
 
-app = Flask(__name__)
-app.secret_key = 'your_secret_key_here'
+logger = logging.getLogger(__name__)
+instrumentation.configure_logging()
 
-# Add this to disable caching
-@app.after_request
+# Static files are cached by browsers for a week
+STATIC_MAX_AGE = 7 * 24 * 3600
+# Rendered per-level ranking sections kept across requests
+FRAGMENT_CACHE_SIZE = 1024
+# Pairs handed out per request by the batched comparison API
+DEFAULT_PAIR_BATCH = 10
+MAX_PAIR_BATCH = 100
+# Start-form labels for the engine's strategies
+MODE_LABELS = {
+    'closure': 'Full ordering',
+    'bradley-terry': 'Bradley-Terry rating',
+    'elo': 'Elo rating',
+}
+PAIRING_LABELS = {
+    'adaptive': 'Adaptive (fewest questions)',
+    'location-heuristic': 'By location and experience',
+    'midpoint': 'Experience neighbours and midpoint',
+}
+
+# Disable caching, except for responses that set their own policy: static
+# files and the ETag-validated rankings
 def add_header(response):
+    if 'Cache-Control' in response.headers:
+        return response
     response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, post-check=0, pre-check=0, max-age=0'
     response.headers['Pragma'] = 'no-cache'
     response.headers['Expires'] = '-1'
     return response
 
-# Sample data input
+# Sample data input, used when ROSTER_PATH does not point at a CSV/Parquet roster
 data = {
     'Employee': ['Jijo', 'Jobin', 'Suhair', 'Anakha', 'Ponny', 'Aneesh R', 'Colin', 'Yoosef', 'Shinoj', 'Arjun', 'Najmal', 'Sreelakshmi', 'Anand', 'Raghu', 'Nithin', 'Rijo', 'Hari', 'Jimmy', 'Mansoor', 'Fredy', 'Bejoy', 'Rahul KD', 'Sasnesh'],
     'Job_Level': ['Senior', 'Mid-Level', 'Senior', 'Junior', 'Mid-Level', 'Senior', 'Junior', 'Mid-Level', 'Senior', 'Junior', 'Junior', 'Mid-Level', 'Mid-Level', 'Senior', 'Senior', 'Senior', 'Senior', 'Mid-Level', 'Mid-Level', 'Mid-Level', 'Mid-Level', 'Junior', 'Junior'],
     'Experience': [17, 7, 16, 1, 5, 10, 2, 9, 14, 3, 2, 6, 7, 14, 15, 12, 14, 9, 8, 8, 9, 3, 2],
     'Location': ['Utah', 'Kochi', 'Utah', 'Utah', 'Kochi', 'Utah', 'Utah', 'Kochi', 'Kochi', ' Kochi', 'Kochi', 'Utah', 'Kochi', 'Utah', 'Kochi', 'Utah', 'Kochi', 'Utah', 'Kochi', 'Utah', 'Utah', 'Kochi', 'Utah']
 }
-df = pd.DataFrame(data)
-
-class EmployeeRanking:
-    def __init__(self, dataframe):
-        self.df = dataframe
-        self.reset()
 
-    def reset(self):
-        """Reset all comparison and ranking data"""
-        self.rankings = {}
-        self.current_pairs = []
-        self.current_pair_index = 0
-        self.completed_comparisons = set()
-        self.wins = {}
-        self.losses = {}
-        print("Rankings reset. Ready for new comparisons.")
+# The roster and backend are built on first use, or up front by preload()
+_state = {}
+_state_lock = threading.Lock()
 
-    def get_next_pair(self):
-        while self.current_pair_index < len(self.current_pairs):
-            pair = self.current_pairs[self.current_pair_index]
-            emp1, emp2 = pair
-            
-            # Create a unique key for this comparison (order-independent)
-            comparison_key = tuple(sorted([emp1['Employee'], emp2['Employee']]))
-            
-            # Skip if comparing same employee (this shouldn't happen, but let's check)
-            if emp1['Employee'] == emp2['Employee']:
-                print(f"Warning: Skipping self-comparison for {emp1['Employee']}")
-                self.current_pair_index += 1
-                continue
-            
-            # Skip if this comparison has already been done
-            if comparison_key in self.completed_comparisons:
-                print(f"Skipping duplicate comparison: {emp1['Employee']} vs {emp2['Employee']}")
-                self.current_pair_index += 1
-                continue
-            
-            # Skip if we can determine the outcome based on previous comparisons
-            if (emp2['Employee'] in self.wins[emp1['Employee']] or 
-                emp1['Employee'] in self.wins[emp2['Employee']]):
-                print(f"Skipping transitive comparison: {emp1['Employee']} vs {emp2['Employee']}")
-                self.current_pair_index += 1
-                continue
-                
-            self.current_pair_index += 1
-            print(f"\nPresenting comparison {len(self.completed_comparisons) + 1}: {emp1['Employee']} vs {emp2['Employee']}")
-            return pair
-            
-        # If we've exhausted all pairs, return None to trigger rankings display
-        print("No more comparisons needed. Ready to show rankings.")
-        return None
-
-    def record_comparison(self, winner_id, loser_id, job_level):
-        # Add to completed comparisons
-        comparison_key = tuple(sorted([winner_id, loser_id]))
-        if comparison_key in self.completed_comparisons:
-            print(f"Warning: Duplicate comparison detected - {winner_id} vs {loser_id}")
-            return
-        
-        self.completed_comparisons.add(comparison_key)
-        print(f"\nRecording comparison {len(self.completed_comparisons)}: {winner_id} beat {loser_id}")
-        
-        if job_level not in self.rankings:
-            self.rankings[job_level] = {}
-            # Initialize all employees in this job level with 0 wins
-            for emp in self.wins.keys():
-                if self.df[self.df['Employee'] == emp]['Job_Level'].iloc[0] == job_level:
-                    self.rankings[job_level][emp] = 0
-        
-        # Record direct win/loss
-        self.wins[winner_id].add(loser_id)
-        self.losses[loser_id].add(winner_id)
-        
-        # Apply transitive property
-        for indirect_loser in self.wins[loser_id]:
-            self.wins[winner_id].add(indirect_loser)
-            self.losses[indirect_loser].add(winner_id)
-            self.completed_comparisons.add(tuple(sorted([winner_id, indirect_loser])))
-            print(f"Transitive win: {winner_id} automatically beats {indirect_loser} (because they lost to {loser_id})")
-        
-        # Update rankings based on total wins
-        self.rankings[job_level][winner_id] = len(self.wins[winner_id])
-        self.rankings[job_level][loser_id] = len(self.wins[loser_id])
-        
-        print(f"\nCurrent rankings for {job_level}:")
-        sorted_rankings = sorted(self.rankings[job_level].items(), key=lambda x: x[1], reverse=True)
-        for emp, wins in sorted_rankings:
-            print(f"  {emp}: {wins} wins")
-            print(f"    Wins against: {self.wins[emp]}")
-            print(f"    Losses to: {self.losses[emp]}")
+def get_roster():
+    roster = _state.get('roster')
+    if roster is None:
+        with _state_lock:
+            if 'roster' not in _state:
+                # pandas is only imported once a roster is actually needed
+                from roster import Roster, load_roster
+                _state['roster'] = Roster(load_roster(os.environ.get('ROSTER_PATH'), sample=data))
+            roster = _state['roster']
+    return roster
 
-    def filter_employees(self, job_level=None, location=None, min_experience=None):
-        filtered_df = self.df.copy()
-        
-        # First level filtering
-        if location:
-            filtered_df = filtered_df[filtered_df['Location'] == location]
-        if min_experience is not None:
-            filtered_df = filtered_df[filtered_df['Experience'] >= min_experience]
-            
-        # Create experience bands within each job level
-        def get_experience_band(exp, job_level):
-            if job_level == 'Senior':
-                if exp >= 15: return 'Senior-High'
-                if exp >= 10: return 'Senior-Mid'
-                return 'Senior-Low'
-            elif job_level == 'Mid-Level':
-                if exp >= 8: return 'Mid-High'
-                if exp >= 5: return 'Mid-Mid'
-                return 'Mid-Low'
-            else:  # Junior
-                if exp >= 3: return 'Junior-High'
-                if exp >= 1: return 'Junior-Mid'
-                return 'Junior-Low'
-        
-        # Add experience band column
-        filtered_df['Experience_Band'] = filtered_df.apply(
-            lambda row: get_experience_band(row['Experience'], row['Job_Level']), 
-            axis=1
-        )
-        
-        # Sort by experience within each band
-        filtered_df = filtered_df.sort_values(['Experience_Band', 'Experience'], ascending=[True, False])
-        
-        return filtered_df
+def build_round(round_id, settings):
+    """Create a fresh EmployeeRanking for one review round's filters and strategies"""
+    from events import broadcaster
+    ranking = EmployeeRanking(
+        get_roster(), mode=settings.get('mode', 'closure'), pairing=settings.get('pairing', 'adaptive')
+    )
+    ranking.listeners.append(partial(broadcaster.publish, round_id))
+    ranking.prepare_clustering(ranking.filter_employees(
+        location=settings['location'], min_experience=settings['min_experience']
+    ))
+    return ranking
 
-    def prepare_clustering(self, filtered_df):
-        self.reset()
-        
-        # Initialize tracking dictionaries
-        self.wins = {emp['Employee']: set() for emp in filtered_df.to_dict('records')}
-        self.losses = {emp['Employee']: set() for emp in filtered_df.to_dict('records')}
-        
-        same_level_pairs = []
-        
-        # First, group by Job Level
-        for job_level in filtered_df['Job_Level'].unique():
-            job_level_df = filtered_df[filtered_df['Job_Level'] == job_level]
-            
-            # Then, subgroup by Location within each Job Level
-            for location in job_level_df['Location'].unique():
-                location_df = job_level_df[job_level_df['Location'] == location]
-                
-                if len(location_df) > 1:
-                    # Sort employees by experience within same location
-                    employees = location_df.sort_values('Experience', ascending=False).to_dict('records')
-                    
-                    # Compare adjacent employees by experience
-                    for i in range(len(employees)-1):
-                        same_level_pairs.append((employees[i], employees[i+1]))
-                    
-                    # Add strategic pairs within location
-                    if len(employees) > 2:
-                        # Compare highest with third highest
-                        same_level_pairs.append((employees[0], employees[2]))
-                        
-                        # Compare every third employee if enough employees exist
-                        for i in range(0, len(employees)-2, 2):
-                            same_level_pairs.append((employees[i], employees[i+2]))
-            
-            # After location-based comparisons, add cross-location comparisons
-            locations = list(job_level_df['Location'].unique())
-            if len(locations) > 1:
-                for i in range(len(locations)-1):
-                    loc1_emp = job_level_df[job_level_df['Location'] == locations[i]].sort_values('Experience', ascending=False).to_dict('records')
-                    loc2_emp = job_level_df[job_level_df['Location'] == locations[i+1]].sort_values('Experience', ascending=False).to_dict('records')
-                    
-                    if loc1_emp and loc2_emp:
-                        # Compare top performers from each location
-                        same_level_pairs.append((loc1_emp[0], loc2_emp[0]))
-                        # Compare second-best if available
-                        if len(loc1_emp) > 1 and len(loc2_emp) > 1:
-                            same_level_pairs.append((loc1_emp[1], loc2_emp[1]))
-        
-        # Remove any duplicate pairs or self-comparisons
-        unique_pairs = []
-        seen_pairs = set()
-        
-        for pair in same_level_pairs:
-            emp1, emp2 = pair[0]['Employee'], pair[1]['Employee']
-            if emp1 != emp2:  # Avoid self-comparisons
-                pair_key = tuple(sorted([emp1, emp2]))
-                if pair_key not in seen_pairs:  # Avoid duplicates
-                    seen_pairs.add(pair_key)
-                    unique_pairs.append(pair)
-        
-        self.current_pairs = unique_pairs
-        self.current_pair_index = 0
-        
-        print("\nInitial Comparisons to be made:")
-        for pair in unique_pairs:
-            print(f"- {pair[0]['Employee']} ({pair[0]['Location']}) vs "
-                  f"{pair[1]['Employee']} ({pair[1]['Location']}) "
-                  f"[{pair[0]['Job_Level']}, Exp: {pair[0]['Experience']} vs {pair[1]['Experience']}]")
+def get_backend():
+    # Each review round gets its own ranking state, keyed by an id kept in the session.
+    # RANKING_BACKEND=sqlite persists rounds in RANKING_DB and shares them across workers.
+    # The memory backend journals votes to RANKING_JOURNAL (set it empty to disable).
+    backend = _state.get('backend')
+    if backend is None:
+        with _state_lock:
+            if 'backend' not in _state:
+                backend_kind = os.environ.get('RANKING_BACKEND', 'memory')
+                if backend_kind == 'sqlite':
+                    backend_options = {'path': os.environ.get('RANKING_DB', 'rankings.db')}
+                else:
+                    journal_dir = os.environ.get('RANKING_JOURNAL', '.ranking_journal')
+                    backend_options = {'journal': VoteJournal(journal_dir) if journal_dir else None}
+                _state['backend'] = create_backend(backend_kind, build_round, **backend_options)
+            backend = _state['backend']
+    return backend
 
-    def get_rankings(self):
-        """Return the current rankings for all job levels"""
-        final_rankings = {}
-        for job_level in self.rankings:
-            sorted_rankings = sorted(
-                self.rankings[job_level].items(),
-                key=lambda x: x[1],
-                reverse=True
-            )
-            final_rankings[job_level] = sorted_rankings
-        return final_rankings
+def preload():
+    """Load the roster and warm the unfiltered view so forked workers share them"""
+    get_roster().filter_employees()
+    get_backend()
 
-ranking_system = EmployeeRanking(df)
+def current_round(shared=False):
+    # Rankings can be shared as ?round=<id>; voting always uses the reviewer's own round
+    round_id = (shared and request.args.get('round')) or session.get('round_id')
+    if round_id is None:
+        return None, None
+    return round_id, get_backend().load(round_id)
 
-@app.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
         location = request.form.get('location')
         min_experience = request.form.get('min_experience')
+        location = location.strip()
         location = None if location.lower() in ['all', ''] else location
         min_experience = int(min_experience) if min_experience.strip() and min_experience != '0' else None
+        mode = request.form.get('ranking_mode')
+        mode = mode if mode in RANKING_MODES else current_app.config['RANKING_MODE']
+        pairing = request.form.get('pairing')
+        pairing = pairing if pairing in PAIRING_STRATEGIES else current_app.config['RANKING_PAIRING']
         
-        # Filter employees and prepare clustering
-        filtered_df = ranking_system.filter_employees(location=location, min_experience=min_experience)
-        ranking_system.prepare_clustering(filtered_df)
+        # Start a new review round with its own filtered employees and pair schedule
+        round_id = uuid.uuid4().hex
+        get_backend().start_round(round_id, {
+            'location': location, 'min_experience': min_experience, 'mode': mode, 'pairing': pairing
+        })
+        session['round_id'] = round_id
         
         return redirect(url_for('compare'))
-    return render_template('index.html')
+    return timed_render(render_template, 'index.html',
+                        ranking_modes=MODE_LABELS, default_mode=current_app.config['RANKING_MODE'],
+                        pairing_strategies=PAIRING_LABELS, default_pairing=current_app.config['RANKING_PAIRING'])
 
-@app.route('/compare', methods=['GET', 'POST'])
 def compare():
+    round_id, ranking = current_round()
+    if ranking is None:
+        return redirect(url_for('index'))
+    
     if request.method == 'POST':
         winner_id = request.form.get('winner')
         loser_id = request.form.get('loser')
@@ -256,33 +143,266 @@ def compare():
         
         if winner_id and loser_id:
             # Record the comparison
-            ranking_system.record_comparison(winner_id, loser_id, job_level)
+            get_backend().record_vote(round_id, ranking, winner_id, loser_id, job_level)
     
     # Get next pair for comparison
-    pair = ranking_system.get_next_pair()
+    with ranking.lock:
+        pair = ranking.get_next_pair()
     
-    # If no more valid pairs or we hit a duplicate, redirect to rankings
-    if pair is None or (
-        pair[0]['Employee'] == pair[1]['Employee'] or  # Same employee comparison
-        tuple(sorted([pair[0]['Employee'], pair[1]['Employee']])) in ranking_system.completed_comparisons  # Duplicate comparison
-    ):
-        print("Comparisons complete, redirecting to rankings...")
+    # If no more valid pairs, redirect to rankings
+    if pair is None:
+        logger.debug("Comparisons complete, redirecting to rankings...")
         return redirect(url_for('show_rankings'))
     
-    return render_template('comparison.html', 
+    return timed_render(render_template, 'comparison.html', 
                          employee1=pair[0], 
-                         employee2=pair[1])
+                         employee2=pair[1],
+                         pairs_url=url_for('pairs_api'),
+                         votes_url=url_for('votes_api'))
+
+def pair_records(pairs):
+    return [{'job_level': employee1['Job_Level'], 'employees': [employee1, employee2]} for employee1, employee2 in pairs]
+
+def next_pairs_response(ranking, count, **extra):
+    count = min(max(count, 1), MAX_PAIR_BATCH)
+    with ranking.lock:
+        pairs = ranking.get_next_pairs(count)
+        version = ranking.version
+    # An empty batch means the round is complete. The version goes back with
+    # the answers so a repeated batch is recognised and not applied twice
+    return jsonify(pairs=pair_records(pairs), version=version, rankings_url=url_for('show_rankings'), **extra)
+
+def pairs_api():
+    """Return the next ?count= undecided pairs so the browser can answer them without reloads"""
+    round_id, ranking = current_round()
+    if ranking is None:
+        return jsonify(error="No review round in progress"), 404
+    return next_pairs_response(ranking, request.args.get('count', DEFAULT_PAIR_BATCH, type=int))
+
+def parse_vote(record):
+    """(winner, loser, job_level) from a vote record; TypeError unless all are strings"""
+    vote = (record['winner'], record['loser'], record['job_level'])
+    if not all(isinstance(field, str) for field in vote):
+        raise TypeError("winner, loser and job_level must be strings")
+    return vote
+
+def votes_api():
+    """Apply a batch of answered pairs in one request and hand out the next batch.
+    
+    Accepts {"votes": [{winner, loser, job_level}, ...], "next": K, "version": V}.
+    Votes are applied under one lock (and one transaction with the SQLite
+    backend). V is the version returned with the pairs; if the round has moved
+    on since, the batch is answered with stale set and is not applied.
+    """
+    round_id, ranking = current_round()
+    if ranking is None:
+        return jsonify(error="No review round in progress"), 404
+    
+    payload = request.get_json(silent=True)
+    try:
+        votes = [parse_vote(record) for record in payload['votes']]
+        count = int(payload.get('next', DEFAULT_PAIR_BATCH))
+        version = payload.get('version')
+        version = None if version is None else int(version)
+    except (KeyError, TypeError, ValueError):
+        return jsonify(error="Expected {votes: [{winner, loser, job_level}], next: K, version: V}"), 400
+    
+    accepted = get_backend().record_votes(round_id, ranking, votes, version)
+    if accepted is None:
+        return next_pairs_response(ranking, count, applied=0, stale=True, rejected=[], conflicts=[])
+    # accepted is an in-order subsequence of votes, so one pass separates the rest
+    rejected, matched = [], 0
+    for vote in votes:
+        if matched < len(accepted) and vote == accepted[matched]:
+            matched += 1
+        else:
+            rejected.append(vote)
+    with ranking.lock:
+        # Accepted votes that contradicted earlier ones and left their employees tied
+        conflicts = [vote for vote in accepted if ranking.is_tied(*vote)]
+    return next_pairs_response(
+        ranking, count,
+        applied=len(accepted),
+        stale=False,
+        rejected=[{'winner': winner, 'loser': loser, 'job_level': job_level} for winner, loser, job_level in rejected],
+        conflicts=[{'winner': winner, 'loser': loser, 'job_level': job_level} for winner, loser, job_level in conflicts]
+    )
+
+def import_votes():
+    """Replay a batch of historical votes into the current round.
+    
+    Accepts JSON, either a list or {"votes": [...]}, of objects with winner,
+    loser and job_level, and reports what was applied and what was rejected.
+    Conflicts are applied too; they are listed because they tie employees.
+    """
+    round_id, ranking = current_round()
+    if ranking is None:
+        return jsonify(error="No review round in progress"), 404
+    
+    payload = request.get_json(silent=True)
+    records = payload.get('votes') if isinstance(payload, dict) else payload
+    try:
+        votes = [parse_vote(record) for record in records]
+    except (KeyError, TypeError):
+        return jsonify(error="Expected a list of {winner, loser, job_level} votes"), 400
+    
+    report = get_backend().import_votes(round_id, ranking, votes)
+    
+    def as_records(rejected):
+        return [{'winner': winner, 'loser': loser, 'job_level': job_level} for winner, loser, job_level in rejected]
+    
+    return jsonify(
+        applied=len(report['accepted']),
+        duplicates=as_records(report['duplicates']),
+        unknown=as_records(report['unknown']),
+        conflicts=as_records(report['conflicts'])
+    )
+
+fragment_cache = LRUCache(FRAGMENT_CACHE_SIZE)
+
+def render_level(round_id, ranking, job_level, limit, offset):
+    """Render one job level's section, reusing the cached HTML until that level changes"""
+    # A round reloaded after eviction is a new object whose level versions may
+    # match stale entries, so the cache is keyed on the object's generation
+    key = (round_id, ranking.generation, job_level, limit, offset)
+    version = ranking.level_versions[job_level]
+    cached = fragment_cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    ranked_employees = ranking.get_level_ranking(job_level, limit, offset)
+    html = timed_render(render_template, 'ranking_level.html', job_level=job_level,
+                        ranked_employees=ranked_employees, offset=offset,
+                        ties=ranking.ties(job_level, [employee for employee, _ in ranked_employees]))
+    fragment_cache.put(key, (version, html))
+    return html
+
+def rankings_etag(round_id, ranking):
+    # The version moves with every accepted vote, so it validates the whole page
+    return f"{round_id}-{ranking.version}"
+
+def rankings_request():
+    """Resolve the round and page for a rankings view.
+    
+    Returns (round_id, ranking, limit, offset, response). response is a ready
+    304 when the client already has this version, or a 404 if there is no round.
+    """
+    round_id, ranking = current_round(shared=True)
+    # ?limit=&offset= pages through each level without materialising the rest
+    limit = request.args.get('limit', type=int)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    if ranking is None:
+        return round_id, None, limit, offset, ("No rankings available yet.", 404)
+    
+    response = None
+    etag = rankings_etag(round_id, ranking)
+    if request.if_none_match.contains(etag):
+        response = cache_rankings(current_app.response_class(status=304), etag)
+    return round_id, ranking, limit, offset, response
+
+def cache_rankings(response, etag):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 
-@app.route('/rankings')
 def show_rankings():
-    rankings = ranking_system.get_rankings()
-    print("Rankings:", rankings)  # Debug print
-    if not rankings:
+    round_id, ranking, limit, offset, response = rankings_request()
+    if response is not None:
+        return response
+    with ranking.lock:
+        etag = rankings_etag(round_id, ranking)
+        fragments = [render_level(round_id, ranking, job_level, limit, offset) for job_level in ranking.ranked_levels()]
+    if not fragments:
         return "No rankings available yet.", 404
-    return render_template('rankings.html', rankings=rankings)
+    page = timed_render(render_template, 'rankings.html', fragments=fragments, round_id=round_id,
+                        version=ranking.version, paged=limit is not None or offset > 0)
+    return cache_rankings(make_response(page), etag)
+
+def stream_rankings():
+    """Server-sent ranking deltas for live viewers.
+    
+    Under a WSGI server every open stream holds a worker thread; asgi.py serves
+    this same route natively on asyncio for large audiences.
+    """
+    from events import Subscription, broadcaster, parse_version, stream
+    round_id, ranking = current_round(shared=True)
+    if ranking is None:
+        return "No rankings available yet.", 404
+    
+    # Subscribe before reading the version so no vote falls in between
+    subscription = broadcaster.subscribe(Subscription(round_id))
+    with ranking.lock:
+        version = ranking.version
+    last_seen = parse_version(request.headers.get('Last-Event-ID') or request.args.get('since'))
+    backend = get_backend()
+    response = Response(
+        stream(subscription, version, last_seen, poll=partial(backend.load, round_id)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    # The generator's own cleanup never runs if the client leaves before the
+    # first chunk, so unsubscribe when the server closes the response too
+    response.call_on_close(partial(broadcaster.unsubscribe, subscription))
+    return response
+
+def rankings_api():
+    """JSON rankings for dashboards, with the same ETag validation as the page"""
+    round_id, ranking, limit, offset, response = rankings_request()
+    if response is not None:
+        return response
+    with ranking.lock:
+        version = ranking.version
+        etag = rankings_etag(round_id, ranking)
+        rankings = ranking.get_rankings(limit, offset)
+        ties = {
+            job_level: ranking.ties(job_level, [employee for employee, _ in ranked_employees])
+            for job_level, ranked_employees in rankings.items()
+        }
+    return cache_rankings(jsonify(
+        round=round_id,
+        version=version,
+        rankings={
+            job_level: [
+                {'rank': offset + i + 1, 'employee': employee, 'score': score, 'tied_with': ties[job_level].get(employee, [])}
+                for i, (employee, score) in enumerate(ranked_employees)
+            ]
+            for job_level, ranked_employees in rankings.items()
+        }
+    ), etag)
+
+def create_app(preload_state=False, mode=None, pairing=None):
+    """Build the Flask app. Heavy imports and the roster load are deferred to the
+    first request unless preload_state is set, e.g. in the gunicorn master.
+    
+    mode and pairing set the strategies the start form defaults to, falling
+    back to RANKING_MODE / RANKING_PAIRING and then closure with adaptive pairs."""
+    app = Flask(__name__)
+    app.secret_key = 'your_secret_key_here'
+    app.config['SEND_FILE_MAX_AGE_DEFAULT'] = STATIC_MAX_AGE
+    app.config['RANKING_MODE'] = mode or os.environ.get('RANKING_MODE', 'closure')
+    app.config['RANKING_PAIRING'] = pairing or os.environ.get('RANKING_PAIRING', 'adaptive')
+    if app.config['RANKING_MODE'] not in RANKING_MODES:
+        raise ValueError(f"Unknown ranking mode: {app.config['RANKING_MODE']}")
+    if app.config['RANKING_PAIRING'] not in PAIRING_STRATEGIES:
+        raise ValueError(f"Unknown pairing strategy: {app.config['RANKING_PAIRING']}")
+    instrumentation.init_app(app)
+    app.after_request(add_header)
+    
+    app.add_url_rule('/', view_func=index, methods=['GET', 'POST'])
+    app.add_url_rule('/compare', view_func=compare, methods=['GET', 'POST'])
+    app.add_url_rule('/votes/import', view_func=import_votes, methods=['POST'])
+    app.add_url_rule('/api/pairs', view_func=pairs_api)
+    app.add_url_rule('/api/votes', view_func=votes_api, methods=['POST'])
+    app.add_url_rule('/rankings', view_func=show_rankings)
+    app.add_url_rule('/api/rankings', view_func=rankings_api)
+    app.add_url_rule('/rankings/stream', view_func=stream_rankings)
+    
+    if preload_state:
+        preload()
+    return app
 
 if __name__ == '__main__':
+    import webbrowser
     print("Starting Flask server...")
     # Open browser automatically
     webbrowser.open('http://127.0.0.1:5000/')
-    app.run(debug=True)
\ No newline at end of file
+    create_app().run(debug=True)
\ No newline at end of file
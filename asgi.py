@@ -0,0 +1,82 @@
+"""ASGI entry point for large audiences watching live rankings.
+
+    uvicorn asgi:app
+
+/rankings/stream is served natively on asyncio, so each idle viewer is a
+suspended coroutine rather than a pinned WSGI thread. Every other route runs
+the unchanged Flask app in asgiref's thread pool, in the same process, so
+votes publish straight to the streams' broadcaster.
+"""
+import asyncio
+from urllib.parse import parse_qs
+
+from asgiref.wsgi import WsgiToAsgi
+
+import app as ranking_app
+from events import AsyncSubscription, astream, broadcaster, parse_version
+
+flask_app = ranking_app.create_app()
+wsgi = WsgiToAsgi(flask_app)
+
+STREAM_HEADERS = [
+    (b'content-type', b'text/event-stream'),
+    (b'cache-control', b'no-cache'),
+    (b'x-accel-buffering', b'no'),
+]
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+    elif scope['type'] == 'http' and scope['path'] == '/rankings/stream':
+        await stream_rankings(scope, receive, send)
+    else:
+        await wsgi(scope, receive, send)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            # Load the roster before the first viewer arrives
+            await asyncio.to_thread(ranking_app.preload)
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def stream_rankings(scope, receive, send):
+    """Async twin of app.stream_rankings; the round must be given as ?round=<id>"""
+    query = parse_qs(scope['query_string'].decode())
+    round_id = query.get('round', [None])[0]
+    backend = ranking_app.get_backend()
+    ranking = await asyncio.to_thread(backend.load, round_id) if round_id else None
+    if ranking is None:
+        await send({'type': 'http.response.start', 'status': 404,
+                    'headers': [(b'content-type', b'text/plain')]})
+        await send({'type': 'http.response.body', 'body': b'No rankings available yet.'})
+        return
+
+    subscription = broadcaster.subscribe(AsyncSubscription(round_id, asyncio.get_running_loop()))
+    version = ranking.version
+    headers = dict(scope['headers'])
+    last_seen = parse_version(headers.get(b'last-event-id') or query.get('since', [None])[0])
+
+    async def pump():
+        await send({'type': 'http.response.start', 'status': 200, 'headers': STREAM_HEADERS})
+        async for chunk in astream(subscription, version, last_seen, poll=lambda: backend.load(round_id)):
+            await send({'type': 'http.response.body', 'body': chunk.encode(), 'more_body': True})
+
+    async def disconnected():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    tasks = [asyncio.ensure_future(pump()), asyncio.ensure_future(disconnected())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Unsubscribes even if the stream never started
+        broadcaster.unsubscribe(subscription)
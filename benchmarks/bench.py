@@ -0,0 +1,224 @@
+"""Benchmark filtering, pair scheduling, voting sessions and the Flask request path.
+
+Synthetic rosters are generated with a hidden ground-truth order, and every
+simulated vote follows that order:
+
+    python benchmarks/bench.py [--sizes 100 1000 10000 100000] [--strategies closure:adaptive elo:adaptive]
+
+Each mode:pairing strategy (or "all") runs its own session on the same
+roster. Prints JSON with latencies and, as a quality metric, the comparisons
+asked per employee and the Spearman correlation of the result with the truth.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import app as app_module  # noqa: E402
+from ranking_engine import PAIRING_STRATEGIES, RANKING_MODES, EmployeeRanking  # noqa: E402
+from roster import ROSTER_COLUMNS, Roster, load_roster  # noqa: E402
+
+
+def synthetic_roster(size, levels, locations, seed=0):
+    """Return (roster rows, hidden strength per employee name)"""
+    rng = np.random.default_rng(seed)
+    names = [f"E{i:07d}" for i in range(size)]
+    rows = {
+        'Employee': names,
+        'Job_Level': [f"L{level:02d}" for level in rng.integers(0, levels, size)],
+        'Experience': rng.integers(0, 30, size),
+        'Location': [f"Site{location:03d}" for location in rng.integers(0, locations, size)],
+    }
+    return rows, dict(zip(names, rng.permutation(size).tolist()))
+
+
+def summarise(samples):
+    """Median, p95 and total of a list of durations in seconds"""
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'median_s': round(statistics.median(ordered), 6),
+        'p95_s': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 6),
+        'total_s': round(sum(ordered), 6),
+    }
+
+
+def timed_call(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def spearman(rankings, truth):
+    """Mean Spearman correlation between each level's ranking and the hidden order"""
+    scores = []
+    for ranked in rankings.values():
+        if len(ranked) < 2:
+            continue
+        hidden = np.array([truth[name] for name, _ in ranked])
+        # ranked is best first, so a perfect result has strictly falling truth
+        positions = np.arange(len(hidden))
+        hidden_positions = np.argsort(np.argsort(-hidden))
+        scores.append(np.corrcoef(positions, hidden_positions)[0, 1])
+    return round(float(np.mean(scores)), 4) if scores else None
+
+
+def bench_filter(roster_df, locations):
+    """Cold and cached filter latency for a few representative filters"""
+    filters = [
+        {},
+        {'location': 'Site000'},
+        {'min_experience': 10},
+        {'location': f"Site{locations - 1:03d}", 'min_experience': 5},
+    ]
+    roster = Roster(roster_df)
+    cold = [timed_call(roster.filter_employees, **f)[1] for f in filters]
+    cached = [timed_call(roster.filter_employees, **f)[1] for f in filters]
+    return {'cold': summarise(cold), 'cached': summarise(cached)}
+
+
+def parse_strategies(values):
+    """Turn mode:pairing arguments into (mode, pairing) tuples; "all" means every combination"""
+    if 'all' in values:
+        return [(mode, pairing) for mode in RANKING_MODES for pairing in PAIRING_STRATEGIES]
+    strategies = []
+    for value in values:
+        mode, _, pairing = value.partition(':')
+        pairing = pairing or 'adaptive'
+        if mode not in RANKING_MODES or pairing not in PAIRING_STRATEGIES:
+            raise argparse.ArgumentTypeError(f"Unknown strategy: {value}")
+        strategies.append((mode, pairing))
+    return strategies
+
+
+def bench_session(roster_df, truth, mode, pairing, max_votes):
+    """Prepare a round and vote by the hidden order until done or max_votes"""
+    ranking = EmployeeRanking(Roster(roster_df), mode=mode, pairing=pairing)
+    filtered = ranking.filter_employees()
+    _, prepare_s = timed_call(ranking.prepare_clustering, filtered)
+
+    pair_times, record_times = [], []
+    while len(record_times) < max_votes:
+        pair, seconds = timed_call(ranking.get_next_pair)
+        pair_times.append(seconds)
+        if pair is None:
+            break
+        first, second = pair
+        winner, loser = (first, second) if truth[first['Employee']] > truth[second['Employee']] else (second, first)
+        _, seconds = timed_call(ranking.record_comparison, winner['Employee'], loser['Employee'], winner['Job_Level'])
+        record_times.append(seconds)
+
+    rankings, rankings_s = timed_call(ranking.get_rankings)
+    return {
+        'prepare_s': round(prepare_s, 6),
+        'next_pair': summarise(pair_times),
+        'record_comparison': summarise(record_times),
+        'get_rankings_s': round(rankings_s, 6),
+        'complete': len(record_times) < max_votes,
+        'comparisons': len(record_times),
+        'comparisons_per_employee': round(len(record_times) / len(filtered), 3),
+        'spearman': spearman(rankings, truth),
+    }
+
+
+def bench_http(roster_df, truth, mode, pairing, requests):
+    """/compare and /rankings round-trips through the Flask test client"""
+    with tempfile.TemporaryDirectory() as workdir:
+        roster_path = os.path.join(workdir, 'roster.csv')
+        pd.DataFrame(roster_df)[ROSTER_COLUMNS].to_csv(roster_path, index=False)
+        os.environ['ROSTER_PATH'] = roster_path
+        os.environ['RANKING_BACKEND'] = 'memory'
+        # Each size needs its own roster, so drop the one loaded for the last size
+        app_module._state.clear()
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            client = app_module.create_app().test_client()
+            _, start_s = timed_call(client.post, '/', data={
+                'location': '', 'min_experience': '', 'ranking_mode': mode, 'pairing': pairing
+            })
+
+            compare_times = []
+            response, seconds = timed_call(client.get, '/compare')
+            compare_times.append(seconds)
+            while response.status_code == 200 and len(compare_times) < requests:
+                html = response.get_data(as_text=True)
+                first, second = re.findall(r'name="winner" value="([^"]+)"', html)
+                job_level = re.search(r'name="job_level" value="([^"]+)"', html).group(1)
+                winner, loser = (first, second) if truth[first] > truth[second] else (second, first)
+                response, seconds = timed_call(
+                    client.post, '/compare', data={'winner': winner, 'loser': loser, 'job_level': job_level}
+                )
+                compare_times.append(seconds)
+
+            rankings_times = [timed_call(client.get, '/rankings')[1] for _ in range(10)]
+            page_times = [timed_call(client.get, '/rankings?limit=10')[1] for _ in range(10)]
+        finally:
+            os.chdir(cwd)
+            app_module._state.clear()
+    return {
+        'start_round_s': round(start_s, 6),
+        'compare': summarise(compare_times),
+        'rankings': summarise(rankings_times),
+        'rankings_top10': summarise(page_times),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 100000])
+    parser.add_argument('--levels', type=int, default=8)
+    parser.add_argument('--locations', type=int, default=20)
+    parser.add_argument('--strategies', nargs='+', default=['closure:adaptive'],
+                        help='mode:pairing pairs to compare, or "all"')
+    parser.add_argument('--max-votes', type=int, default=20000,
+                        help='stop simulated sessions after this many votes')
+    parser.add_argument('--requests', type=int, default=200,
+                        help='/compare round-trips per size')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--skip-http', action='store_true')
+    args = parser.parse_args()
+    try:
+        strategies = parse_strategies(args.strategies)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    results = []
+    for size in args.sizes:
+        rows, truth = synthetic_roster(size, args.levels, args.locations, args.seed)
+        roster_df, load_s = timed_call(load_roster, sample=rows)
+        result = {
+            'employees': size,
+            'load_s': round(load_s, 6),
+            'filter': bench_filter(roster_df, args.locations),
+            'strategies': {},
+        }
+        for mode, pairing in strategies:
+            strategy = {'session': bench_session(roster_df, truth, mode, pairing, args.max_votes)}
+            if not args.skip_http:
+                strategy['http'] = bench_http(rows, truth, mode, pairing, args.requests)
+            result['strategies'][f"{mode}:{pairing}"] = strategy
+        results.append(result)
+
+    print(json.dumps({
+        'levels': args.levels,
+        'locations': args.locations,
+        'seed': args.seed,
+        'results': results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Measure cold-start time and RSS of the Flask app.
+
+Each scenario runs in a fresh interpreter so import costs are not shared:
+
+    python benchmarks/startup.py [--module app] [--runs 5]
+
+Prints JSON with the median seconds spent importing the module, in
+create_app(), and serving the first request, plus RSS after each step.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = '''
+import json, sys, time
+
+def rss_mb():
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+start = time.perf_counter()
+module = __import__(sys.argv[1])
+imported = time.perf_counter()
+rss_import = rss_mb()
+app = module.create_app(preload_state=sys.argv[2] == 'preload')
+created = time.perf_counter()
+rss_create = rss_mb()
+client = app.test_client()
+client.post('/', data={'location': '', 'min_experience': ''})
+client.get('/compare')
+served = time.perf_counter()
+print(json.dumps({
+    'import_s': imported - start,
+    'create_app_s': created - imported,
+    'first_request_s': served - created,
+    'rss_after_import_mb': rss_import,
+    'rss_after_create_app_mb': rss_create,
+    'rss_after_first_request_mb': rss_mb(),
+}))
+'''
+
+
+def run_probe(module, mode):
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE, module, mode],
+        cwd=REPO_ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--module', default='app')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    results = {}
+    for mode in ('lazy', 'preload'):
+        samples = [run_probe(args.module, mode) for _ in range(args.runs)]
+        results[mode] = {
+            key: round(statistics.median(sample[key] for sample in samples), 4)
+            for key in samples[0]
+        }
+    print(json.dumps({'module': args.module, 'runs': args.runs, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
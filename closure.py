@@ -0,0 +1,204 @@
+class TransitiveClosure:
+    """Reachability between employees stored as one int bitset per employee.
+
+    Bit j of beats[i] is set when employee i beat employee j, directly or
+    through any chain of votes. beaten_by is the transpose, kept so a new vote
+    can be pushed up to everyone who already beat the winner.
+
+    Contradictory votes (A > B > C, then C > A) are kept: everyone on the
+    cycle reaches everyone else, so beats[i] & beaten_by[i] is i's tie group,
+    a strongly connected component of the vote graph. Win counts only count
+    employees beaten outside the group, which ranks the condensed DAG.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.beats = [0] * size
+        self.beaten_by = [0] * size
+
+    def has_beaten(self, winner, loser):
+        return (self.beats[winner] >> loser) & 1 == 1
+
+    def is_decided(self, emp1, emp2):
+        return self.has_beaten(emp1, emp2) or self.has_beaten(emp2, emp1)
+
+    def related(self, emp):
+        """Bits of everyone whose order against emp is known, emp included"""
+        return self.beats[emp] | self.beaten_by[emp] | (1 << emp)
+
+    def is_tied(self, emp1, emp2):
+        return self.has_beaten(emp1, emp2) and self.has_beaten(emp2, emp1)
+
+    def tied(self, emp):
+        """Bits of emp's tie group, emp included; 0 when emp is on no cycle"""
+        return self.beats[emp] & self.beaten_by[emp]
+
+    def group_leader(self, emp):
+        """The lowest id in emp's tie group, or emp itself when it is on no cycle"""
+        group = self.tied(emp)
+        return (group & -group).bit_length() - 1 if group else emp
+
+    def win_count(self, emp):
+        return (self.beats[emp] & ~self.beaten_by[emp]).bit_count()
+
+    def add(self, winner, loser):
+        """Record winner > loser and return the ids whose win count changed.
+
+        A vote the closure already contradicts closes a cycle, merging
+        everyone on it into one tie group.
+        """
+        if self.has_beaten(winner, loser):
+            return []
+        closes_cycle = self.has_beaten(loser, winner)
+
+        # Everyone at or above the winner now beats everyone at or below the loser
+        new_losers = self.beats[loser] | (1 << loser)
+        new_winners = self.beaten_by[winner] | (1 << winner)
+
+        changed = []
+        for emp in iter_bits(new_winners):
+            if new_losers & ~self.beats[emp]:
+                self.beats[emp] |= new_losers
+                changed.append(emp)
+        for emp in iter_bits(new_losers):
+            self.beaten_by[emp] |= new_winners
+        if closes_cycle:
+            # The merged group's members lose each other as wins
+            group = self.tied(winner)
+            changed = [emp for emp in changed if not (group >> emp) & 1] + list(iter_bits(group))
+        return changed
+
+
+def iter_bits(bits):
+    """Yield the positions of the set bits, lowest first"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def strongly_connected_components(size, successors):
+    """Iterative Tarjan over nodes 0..size-1 with adjacency lists.
+
+    Returns a component id per node. Ids are assigned in reverse topological
+    order of the condensed graph, so every edge runs from a higher id to a
+    lower or equal one.
+    """
+    index = [-1] * size
+    low = [0] * size
+    on_stack = [False] * size
+    component = [-1] * size
+    stack = []
+    counter = 0
+    next_component = 0
+
+    for root in range(size):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, 0)]
+
+        while work:
+            node, child_pos = work[-1]
+            children = successors[node]
+            if child_pos < len(children):
+                work[-1] = (node, child_pos + 1)
+                child = children[child_pos]
+                if index[child] == -1:
+                    index[child] = low[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack[child] = True
+                    work.append((child, 0))
+                elif on_stack[child]:
+                    low[node] = min(low[node], index[child])
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component[member] = next_component
+                    if member == node:
+                        break
+                next_component += 1
+
+    return component
+
+
+def rebuild_closure(job):
+    """Recompute one job level's closure from its direct votes in a single pass.
+
+    job is (size, edges, first_new): edges are (winner, loser) local ids and
+    edges[first_new:] are the votes being imported. Every vote is kept; the
+    graph is condensed into its strongly connected components and reachability
+    is computed once per component over the resulting DAG. Returns (beats,
+    beaten_by, tied) where tied lists the indices of imported votes that sit
+    on a cycle, i.e. inside a tie group.
+    """
+    size, edges, first_new = job
+
+    successors = [[] for _ in range(size)]
+    for winner, loser in edges:
+        successors[winner].append(loser)
+    component = strongly_connected_components(size, successors)
+    tied = [
+        i for i in range(first_new, len(edges))
+        if component[edges[i][0]] == component[edges[i][1]]
+    ]
+
+    members = [0] * (max(component, default=-1) + 1)
+    for node in range(size):
+        members[component[node]] |= 1 << node
+    # Votes never pair an employee with themselves, so any multi-member component is a tie
+    groups = [bits if bits & (bits - 1) else 0 for bits in members]
+
+    # Component ids are a reverse topological order of the condensed DAG
+    order = sorted(range(size), key=component.__getitem__)
+    reach = list(groups)
+    for node in order:
+        for loser in successors[node]:
+            if component[loser] != component[node]:
+                reach[component[node]] |= reach[component[loser]] | (1 << loser)
+    beats = [reach[component[node]] for node in range(size)]
+
+    reached_by = list(groups)
+    for node in reversed(order):
+        bits = reached_by[component[node]] | (1 << node)
+        for loser in successors[node]:
+            if component[loser] != component[node]:
+                reached_by[component[loser]] |= bits
+    beaten_by = [reached_by[component[node]] for node in range(size)]
+
+    return beats, beaten_by, tied
+
+
+def apply_votes(job):
+    """Add one job level's votes in order to a copy of its closure, as recording
+    them one by one would.
+
+    job is (size, beats, beaten_by, edges) with edges as (winner, loser) local
+    ids. A vote whose outcome is already known, from earlier votes or from
+    earlier in the batch, is skipped. Returns (beats, beaten_by, accepted,
+    conflicts): the indices of the accepted edges and of those that closed a
+    cycle.
+    """
+    size, beats, beaten_by, edges = job
+    closure = TransitiveClosure(size)
+    closure.beats, closure.beaten_by = list(beats), list(beaten_by)
+    accepted, conflicts = [], []
+    for i, (winner, loser) in enumerate(edges):
+        if closure.has_beaten(winner, loser):
+            continue
+        if closure.has_beaten(loser, winner):
+            conflicts.append(i)
+        closure.add(winner, loser)
+        accepted.append(i)
+    return closure.beats, closure.beaten_by, accepted, conflicts
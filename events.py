@@ -0,0 +1,151 @@
+import asyncio
+import json
+import threading
+from collections import deque
+
+
+# Events a viewer may fall behind by before its backlog is replaced by a reset
+MAX_BACKLOG = 256
+# Seconds between keep-alive comments, which also trigger a catch-up poll
+HEARTBEAT_SECONDS = 15
+
+
+class Subscription:
+    """One viewer's queue of pending ranking events for a review round.
+
+    Publishing never blocks the voting request: events are appended under a
+    short lock and the viewer is woken up. A viewer that falls MAX_BACKLOG
+    events behind gets a single reset event instead and refetches the rankings.
+    """
+
+    def __init__(self, round_id):
+        self.round_id = round_id
+        self.lock = threading.Lock()
+        self.pending = deque()
+        self.wakeup = threading.Event()
+
+    def push(self, event):
+        with self.lock:
+            if len(self.pending) >= MAX_BACKLOG:
+                self.pending.clear()
+                event = {'reset': True, 'version': event['version']}
+            self.pending.append(event)
+        self.notify()
+
+    def notify(self):
+        self.wakeup.set()
+
+    def drain(self):
+        with self.lock:
+            events = list(self.pending)
+            self.pending.clear()
+            self.wakeup.clear()
+        return events
+
+    def wait(self, timeout):
+        return self.wakeup.wait(timeout)
+
+
+class AsyncSubscription(Subscription):
+    """A subscription consumed by an asyncio task; publishers may run in any thread"""
+
+    def __init__(self, round_id, loop):
+        super().__init__(round_id)
+        self.loop = loop
+        self.ready = asyncio.Event()
+
+    def notify(self):
+        self.loop.call_soon_threadsafe(self.ready.set)
+
+    def drain(self):
+        self.ready.clear()
+        return super().drain()
+
+    async def wait(self, timeout):
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+class Broadcaster:
+    """Fans ranking deltas out to every viewer subscribed to a round"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = {}
+
+    def subscribe(self, subscription):
+        with self.lock:
+            self.subscriptions.setdefault(subscription.round_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            viewers = self.subscriptions.get(subscription.round_id)
+            if viewers is not None:
+                viewers.discard(subscription)
+                if not viewers:
+                    del self.subscriptions[subscription.round_id]
+
+    def publish(self, round_id, event):
+        with self.lock:
+            viewers = list(self.subscriptions.get(round_id, ()))
+        for subscription in viewers:
+            subscription.push(event)
+
+
+broadcaster = Broadcaster()
+
+
+def format_event(event):
+    """Encode one ranking event as a server-sent event"""
+    kind = 'reset' if event.get('reset') else 'delta'
+    return f"id: {event['version']}\nevent: {kind}\ndata: {json.dumps(event)}\n\n"
+
+
+def parse_version(value):
+    """Read a Last-Event-ID header or ?since= value; None when absent or malformed"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def opening_events(version, last_seen):
+    """Tell a (re)connecting viewer to refetch if it missed any votes"""
+    if last_seen is not None and last_seen != version:
+        return format_event({'reset': True, 'version': version})
+    return ': connected\n\n'
+
+
+def stream(subscription, version, last_seen=None, poll=None):
+    """Blocking SSE generator for WSGI servers; holds a worker thread while open"""
+    try:
+        yield opening_events(version, last_seen)
+        while True:
+            if not subscription.wait(HEARTBEAT_SECONDS):
+                # Catching up may publish votes other workers stored
+                if poll is not None:
+                    poll()
+                yield ': keepalive\n\n'
+            for event in subscription.drain():
+                yield format_event(event)
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+async def astream(subscription, version, last_seen=None, poll=None):
+    """The same stream as an async generator, so idle viewers cost no thread"""
+    try:
+        yield opening_events(version, last_seen)
+        while True:
+            if not await subscription.wait(HEARTBEAT_SECONDS):
+                if poll is not None:
+                    await asyncio.to_thread(poll)
+                yield ': keepalive\n\n'
+            for event in subscription.drain():
+                yield format_event(event)
+    finally:
+        broadcaster.unsubscribe(subscription)
@@ -0,0 +1,24 @@
+# gunicorn -c gunicorn.conf.py
+#
+# The app is created in the master with the roster already loaded, so forked
+# workers share those pages instead of each importing pandas and parsing the
+# roster again.
+#
+# Workers only see each other's review rounds through RANKING_BACKEND=sqlite
+# or the memory backend's vote journal, so one worker is the default unless
+# the sqlite backend is selected; set WEB_CONCURRENCY to scale out.
+import os
+
+backend = os.environ.get('RANKING_BACKEND', 'memory')
+journal = os.environ.get('RANKING_JOURNAL', '.ranking_journal')
+
+wsgi_app = 'app:create_app(preload_state=True)'
+preload_app = True
+workers = int(os.environ.get('WEB_CONCURRENCY', 2 if backend == 'sqlite' else 1))
+bind = os.environ.get('BIND', '127.0.0.1:8000')
+
+if workers > 1 and backend == 'memory' and not journal:
+    raise RuntimeError(
+        "The memory backend without a journal keeps each round in one worker; "
+        "use RANKING_BACKEND=sqlite, keep RANKING_JOURNAL set, or run one worker"
+    )
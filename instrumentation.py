@@ -0,0 +1,107 @@
+import logging
+import os
+import threading
+import time
+from functools import wraps
+
+
+# Timing is off unless RANKING_METRICS is set; when off, timed() returns the
+# function unchanged so there is no per-call overhead at all
+METRICS_ENABLED = os.environ.get('RANKING_METRICS', '').lower() in ('1', 'true', 'yes')
+
+
+def configure_logging():
+    """Enable tracing output when RANKING_LOG_LEVEL is set (e.g. DEBUG or INFO)"""
+    level = os.environ.get('RANKING_LOG_LEVEL')
+    if level:
+        logging.basicConfig(
+            level=level.upper(),
+            format='%(asctime)s %(levelname)s %(name)s: %(message)s'
+        )
+
+
+class Metrics:
+    """Call counts and total seconds per (metric, label), rendered as Prometheus text"""
+
+    HELP = {
+        'ranking_operation_seconds': 'Time spent in ranking engine operations',
+        'ranking_request_seconds': 'Time spent handling HTTP requests per route',
+        'ranking_render_seconds': 'Time spent rendering templates',
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timings = {}
+
+    def observe(self, metric, label, value, seconds):
+        key = (metric, label, value)
+        with self.lock:
+            entry = self.timings.setdefault(key, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def render(self):
+        with self.lock:
+            timings = sorted(self.timings.items())
+        lines = []
+        current_metric = None
+        for (metric, label, value), (count, total) in timings:
+            if metric != current_metric:
+                current_metric = metric
+                lines.append(f"# HELP {metric} {self.HELP.get(metric, metric)}")
+                lines.append(f"# TYPE {metric} summary")
+            lines.append(f'{metric}_count{{{label}="{value}"}} {count}')
+            lines.append(f'{metric}_sum{{{label}="{value}"}} {total:.6f}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+def timed(operation):
+    """Record the decorated function's latency as ranking_operation_seconds{operation=...}"""
+    def decorate(func):
+        if not METRICS_ENABLED:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metrics.observe('ranking_operation_seconds', 'operation', operation, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def timed_render(render, template, **context):
+    """Call render(template, **context), timing it when metrics are enabled"""
+    if not METRICS_ENABLED:
+        return render(template, **context)
+    start = time.perf_counter()
+    try:
+        return render(template, **context)
+    finally:
+        metrics.observe('ranking_render_seconds', 'template', template, time.perf_counter() - start)
+
+
+def init_app(app):
+    """Register per-route timing hooks and the /metrics endpoint"""
+    from flask import Response, g, request
+
+    if METRICS_ENABLED:
+        @app.before_request
+        def start_timer():
+            g.request_start = time.perf_counter()
+
+        @app.teardown_request
+        def stop_timer(exc):
+            start = g.pop('request_start', None)
+            if start is not None:
+                route = request.url_rule.rule if request.url_rule else 'unmatched'
+                metrics.observe('ranking_request_seconds', 'route', route, time.perf_counter() - start)
+
+    @app.route('/metrics')
+    def prometheus_metrics():
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,172 @@
+import json
+import os
+import pickle
+import zlib
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Windows has no gunicorn, so only one process ever writes the journal
+    fcntl = None
+
+
+# Votes between snapshots; recovery replays at most this many
+SNAPSHOT_EVERY = 1000
+
+
+def roster_fingerprint(ranking):
+    """Identify the filtered roster a snapshot's integer ids refer to"""
+    return zlib.crc32('\n'.join(ranking.employees.names).encode())
+
+
+class VoteJournal:
+    """Append-only vote log with periodic snapshots, so in-memory rounds survive restarts.
+
+    Each round is <round_id>.ndjson: a header line with the round's settings,
+    then one [winner, loser, job_level] line per accepted vote. Every
+    snapshot_every votes the ranking's state is pickled to <round_id>.snapshot
+    along with the journal offset it covers, so recovery loads the snapshot
+    and replays only the votes after it.
+
+    Lines are flushed as they are written, which survives a process crash;
+    pass fsync=True to also survive losing the machine, at ~1 ms per vote.
+
+    Several worker processes may serve the same round. Each ranking remembers
+    the journal offset it has applied up to, and every append happens under an
+    exclusive flock: the writer first replays lines other workers appended,
+    then applies its votes, so all workers apply the same vote order.
+    """
+
+    def __init__(self, directory, snapshot_every=SNAPSHOT_EVERY, fsync=False):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, round_id, suffix):
+        # Round ids can come from ?round=, so never let one name a path
+        if not round_id.isalnum():
+            raise ValueError(f"Invalid round id: {round_id!r}")
+        return os.path.join(self.directory, f"{round_id}.{suffix}")
+
+    def write(self, path, mode, text):
+        with open(path, mode) as f:
+            f.write(text)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+            return f.tell()
+
+    @contextmanager
+    def locked(self, path):
+        """Open a journal for reading and appending, holding its lock until closed"""
+        with open(path, 'rb+') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield f
+
+    def read_tail(self, f, offset):
+        """Return the complete vote lines after offset and the offset past them.
+
+        A torn final line can only be left by a crash, since writers hold the
+        lock; it is dropped so later appends start on a fresh line.
+        """
+        f.seek(offset)
+        votes = []
+        for line in f:
+            if not line.endswith(b'\n'):
+                f.truncate(offset)
+                break
+            votes.append(tuple(json.loads(line)))
+            offset += len(line)
+        return votes, offset
+
+    def apply_tail(self, f, ranking, replay):
+        votes, ranking.journal_offset = self.read_tail(f, ranking.journal_offset)
+        replay(ranking, votes)
+        ranking.journal_seq += len(votes)
+
+    def start_round(self, round_id, filters, ranking):
+        offset = self.write(self.path(round_id, 'ndjson'), 'w', json.dumps(filters) + '\n')
+        snapshot_path = self.path(round_id, 'snapshot')
+        if os.path.exists(snapshot_path):
+            os.remove(snapshot_path)
+        ranking.journal_offset = offset
+
+    def catch_up(self, round_id, ranking, replay):
+        """Apply votes other processes appended since this one last read the journal"""
+        path = self.path(round_id, 'ndjson')
+        try:
+            # Nothing new is the common case, and needs no lock
+            if os.path.getsize(path) == ranking.journal_offset:
+                return
+            with self.locked(path) as f:
+                self.apply_tail(f, ranking, replay)
+        except FileNotFoundError:
+            return
+
+    def append(self, round_id, ranking, apply_votes, replay):
+        """Catch up, apply votes and log the accepted ones, all under the journal lock.
+
+        apply_votes returns the accepted votes. A snapshot is taken once enough
+        votes have built up since the last one.
+        """
+        with self.locked(self.path(round_id, 'ndjson')) as f:
+            self.apply_tail(f, ranking, replay)
+            accepted = apply_votes()
+            if accepted:
+                f.seek(0, os.SEEK_END)
+                f.write(''.join(json.dumps(list(vote)) + '\n' for vote in accepted).encode())
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+                ranking.journal_offset = f.tell()
+                ranking.journal_seq += len(accepted)
+                if ranking.journal_seq - ranking.snapshot_seq >= self.snapshot_every:
+                    self.snapshot(round_id, ranking)
+        return accepted
+
+    def snapshot(self, round_id, ranking):
+        # Callers hold the journal lock, so workers never share the .tmp file
+        path = self.path(round_id, 'snapshot')
+        with open(path + '.tmp', 'wb') as f:
+            pickle.dump({
+                'seq': ranking.journal_seq,
+                'offset': ranking.journal_offset,
+                'roster': roster_fingerprint(ranking),
+                'state': ranking.snapshot(),
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+            if self.fsync:
+                os.fsync(f.fileno())
+        # Readers only ever see a complete snapshot
+        os.replace(path + '.tmp', path)
+        ranking.snapshot_seq = ranking.journal_seq
+
+    def recover(self, round_id, build_round, replay):
+        """Rebuild a round from its latest snapshot plus the journal tail, or None if unknown"""
+        try:
+            path = self.path(round_id, 'ndjson')
+        except ValueError:
+            return None
+        if not os.path.exists(path):
+            return None
+
+        with self.locked(path) as f:
+            ranking = build_round(round_id, json.loads(f.readline()))
+            ranking.journal_offset = f.tell()
+            snapshot = self.load_snapshot(round_id)
+            # A snapshot taken against a different roster has stale ids, so replay everything
+            if snapshot is not None and snapshot['roster'] == roster_fingerprint(ranking):
+                ranking.restore(snapshot['state'])
+                ranking.journal_seq = ranking.snapshot_seq = snapshot['seq']
+                ranking.journal_offset = snapshot['offset']
+            self.apply_tail(f, ranking, replay)
+        return ranking
+
+    def load_snapshot(self, round_id):
+        try:
+            with open(self.path(round_id, 'snapshot'), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
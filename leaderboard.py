@@ -0,0 +1,60 @@
+from bisect import bisect_left, insort
+from itertools import islice
+
+
+class Leaderboard:
+    """One job level's employees ordered by win count, maintained incrementally.
+
+    Employees are bucketed by win count and the distinct counts are kept in a
+    sorted list. Moving an employee costs a dict update plus a bisect, and
+    reading the top k only walks the buckets it returns.
+    """
+
+    def __init__(self, names):
+        self.counts = dict.fromkeys(names, 0)
+        self.buckets = {0: dict.fromkeys(names)} if self.counts else {}
+        self.keys = [0] if self.counts else []
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __getitem__(self, name):
+        return self.counts[name]
+
+    def update(self, name, count):
+        old = self.counts[name]
+        if old == count:
+            return
+
+        bucket = self.buckets[old]
+        del bucket[name]
+        if not bucket:
+            del self.buckets[old]
+            del self.keys[bisect_left(self.keys, old)]
+
+        if count not in self.buckets:
+            self.buckets[count] = {}
+            insort(self.keys, count)
+        self.buckets[count][name] = None
+        self.counts[name] = count
+
+    def move_to_end(self, name):
+        """Move name behind everyone else with its win count, e.g. to keep a tie group together"""
+        bucket = self.buckets[self.counts[name]]
+        del bucket[name]
+        bucket[name] = None
+
+    def top(self, limit=None, offset=0):
+        """Return (employee, wins) pairs from rank offset on, highest wins first"""
+        result = []
+        for count in reversed(self.keys):
+            bucket = self.buckets[count]
+            if offset >= len(bucket):
+                offset -= len(bucket)
+                continue
+            for name in islice(bucket, offset, None):
+                if limit is not None and len(result) >= limit:
+                    return result
+                result.append((name, count))
+            offset = 0
+        return result
@@ -0,0 +1,17 @@
+from array import array
+
+
+def pair_array(size):
+    """An empty array of packed pair codes i * size + j; 32-bit while size**2 fits, else 64-bit"""
+    return array('I' if size * size <= 1 << 32 else 'Q')
+
+
+def pack(i, j, size):
+    return i * size + j
+
+
+def unpack_array(codes, size):
+    """Split a pair_array into NumPy arrays of first and second ids"""
+    import numpy as np
+    codes = np.frombuffer(codes, dtype=f"u{codes.itemsize}")
+    return codes // size, codes % size
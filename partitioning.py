@@ -0,0 +1,50 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Below this much work (employees or votes) the process pool costs more than it saves
+PARALLEL_MIN_EMPLOYEES = 50_000
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(workers):
+    """One long-lived pool per size and process.
+
+    Workers are spawned rather than forked: the app serves requests from
+    threads, and forking a multi-threaded process can leave children holding
+    locks nobody will release. A pool is never shared across a fork either,
+    e.g. from a preloading gunicorn master.
+    """
+    key = (os.getpid(), workers)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('spawn')
+            )
+        return pool
+
+
+def parallel_map(func, items, workers=None, total_size=0):
+    """Apply func to independent job-level partitions, in a process pool when worth it.
+
+    Only use this for work that dwarfs pickling its inputs, like rebuilding a
+    closure from thousands of votes; cheap per-level work should run inline.
+    func must be a module-level function so it can be pickled. Results come back
+    in the same order as items.
+    """
+    items = list(items)
+    if workers == 1 or len(items) < 2 or total_size < PARALLEL_MIN_EMPLOYEES:
+        return [func(item) for item in items]
+    pool = get_pool(workers)
+    return list(pool.map(func, items, chunksize=max(1, len(items) // (4 * (workers or 4)))))
+
+
+def seed_order(experience):
+    """Insertion order for one job level: local ids, most experienced first"""
+    import numpy as np
+    return np.argsort(-np.asarray(experience), kind='stable')
@@ -0,0 +1,456 @@
+import itertools
+import logging
+import os
+import threading
+
+from closure import TransitiveClosure, apply_votes, iter_bits, rebuild_closure
+from scheduling import PAIR_LISTS, InsertionScheduler, PairListScheduler, plan_pairs
+from leaderboard import Leaderboard
+from pairs import pack, pair_array, unpack_array
+from partitioning import parallel_map, seed_order
+from instrumentation import timed
+
+logger = logging.getLogger(__name__)
+
+# Inference: 'closure' builds a full transitive ordering; the rating modes fit
+# Bradley-Terry scores instead (see rating.py) for pools too large to order
+RANKING_MODES = ('closure', 'bradley-terry', 'elo')
+# Pair selection: 'adaptive' is binary insertion for the closure and
+# closest-rating pairing for the rating modes; the others walk a fixed list
+PAIRING_STRATEGIES = ('adaptive', *PAIR_LISTS)
+RATING_BUDGET = int(os.environ.get('RATING_COMPARISONS', 0)) or None
+# Everything EmployeeRanking derives from votes; pickled together so the
+# schedulers keep sharing their level's closure or rating model
+SNAPSHOT_FIELDS = ('version', 'level_versions', 'votes', 'rankings', 'schedulers', 'closures', 'ratings')
+# Distinguishes ranking objects, so caches keyed by version never mix two
+# copies of a round that reached the same version by different votes
+_generations = itertools.count(1)
+
+
+class EmployeeRanking:
+    """Ranks employees within each job level from pairwise votes.
+
+    mode picks how votes are turned into rankings and pairing picks which pairs
+    are asked; any combination of RANKING_MODES and PAIRING_STRATEGIES works.
+    """
+
+    def __init__(self, roster, workers=None, mode='closure', pairing='adaptive', rating_budget=RATING_BUDGET):
+        if mode not in RANKING_MODES:
+            raise ValueError(f"Unknown ranking mode: {mode}")
+        if pairing not in PAIRING_STRATEGIES:
+            raise ValueError(f"Unknown pairing strategy: {pairing}")
+        self.roster = roster
+        self.workers = workers
+        self.mode = mode
+        self.pairing = pairing
+        self.rating_budget = rating_budget
+        self.lock = threading.RLock()
+        self.generation = next(_generations)
+        # Bumped once per accepted vote and per prepare, so it identifies the
+        # standings shown; level_versions record when each level last changed
+        self.version = 0
+        self.level_versions = {}
+        # Called with each ranking delta, e.g. to push it to live viewers
+        self.listeners = []
+        # How far into its backend's vote log this copy is: the last SQLite
+        # seq applied, or the VoteJournal byte offset and vote counts
+        self.applied_seq = 0
+        self.journal_offset = 0
+        self.journal_seq = 0
+        self.snapshot_seq = 0
+        self.reset()
+
+    def reset(self):
+        """Reset all comparison and ranking data"""
+        self.rankings = {}
+        self.schedulers = {}
+        # Accepted votes as packed winner * n + loser codes over employee ids
+        self.votes = pair_array(0)
+        self.employees = None
+        self.closures = {}
+        self.ratings = {}
+        self.level_versions = {}
+        logger.debug("Rankings reset. Ready for new comparisons.")
+
+    @timed('pair_selection')
+    def get_next_pair(self):
+        pairs = self.get_next_pairs(1)
+        if pairs:
+            return pairs[0]
+        
+        # If every level is fully ordered, return None to trigger rankings display
+        logger.debug("No more comparisons needed. Ready to show rankings.")
+        return None
+
+    def get_next_pairs(self, limit):
+        """Return up to limit undecided (row1, row2) pairs whose outcomes are independent"""
+        # Ask for the most informative undecided pairs, one job level at a time
+        pairs = []
+        for job_level, scheduler in self.schedulers.items():
+            if len(pairs) >= limit:
+                break
+            names = self.employees.names
+            members = self.employees.level_members[job_level]
+            for local1, local2 in scheduler.next_pairs(limit - len(pairs)):
+                emp1, emp2 = members[local1], members[local2]
+                logger.debug("Presenting comparison %d: %s vs %s (%s)",
+                             len(self.votes) + len(pairs) + 1, names[emp1], names[emp2], job_level)
+                pairs.append((self.employees.row(emp1), self.employees.row(emp2)))
+        return pairs
+
+    @timed('closure_update')
+    def record_comparison(self, winner_id, loser_id, job_level):
+        if self.ratings:
+            return self.record_rating(winner_id, loser_id, job_level)
+        
+        winner, loser = self.employees.ids.get(winner_id), self.employees.ids.get(loser_id)
+        if winner is None or loser is None:
+            logger.warning("Unknown employee in vote - %s vs %s", winner_id, loser_id)
+            return False
+        if winner == loser:
+            logger.warning("Employee voted against themselves - %s", winner_id)
+            return False
+        
+        # Both employees must belong to the job level being ranked
+        if job_level not in self.closures or {self.employees.job_level(winner), self.employees.job_level(loser)} != {job_level}:
+            logger.warning("%s and %s are not both in %s", winner_id, loser_id, job_level)
+            return False
+        
+        # Skip repeats and votes whose outcome the closure already knows; every
+        # recorded pair is decided, so this is also the duplicate check
+        closure = self.closures[job_level]
+        local_ids = self.employees.local_ids
+        local_winner, local_loser = int(local_ids[winner]), int(local_ids[loser])
+        if closure.has_beaten(local_winner, local_loser):
+            logger.warning("Outcome already known - %s vs %s", winner_id, loser_id)
+            return False
+        # A vote against the known outcome closes a cycle; it is kept, and
+        # everyone on the cycle is ranked as tied
+        closes_cycle = closure.has_beaten(local_loser, local_winner)
+        if closes_cycle:
+            logger.warning("Contradictory vote - %s beat %s, tying everyone on the cycle", winner_id, loser_id)
+        
+        self.votes.append(pack(winner, loser, len(self.employees)))
+        logger.debug("Recording comparison %d: %s beat %s", len(self.votes), winner_id, loser_id)
+        
+        self.init_level_rankings(job_level)
+        
+        # Record the win and push it through the level's transitive closure
+        changed = closure.add(local_winner, local_loser)
+        
+        # Update rankings for everyone whose win count moved, tie groups side by side
+        members = self.employees.level_members[job_level]
+        changed.sort(key=closure.group_leader)
+        moved = [(self.employees.names[members[emp]], closure.win_count(emp)) for emp in changed]
+        for name, wins in moved:
+            self.rankings[job_level].update(name, wins)
+        if closes_cycle:
+            for emp in iter_bits(closure.tied(local_winner)):
+                self.rankings[job_level].move_to_end(self.employees.names[members[emp]])
+        # Viewers refetch after a new tie so its annotations show up
+        self.touch(job_level, moved=None if closes_cycle else moved)
+        
+        # Dumping the whole table is O(n log n) per vote, so only do it when tracing
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Current rankings for %s:", job_level)
+            for emp, wins in self.rankings[job_level].top():
+                emp_id = local_ids[self.employees.ids[emp]]
+                logger.debug("  %s: %d wins", emp, wins)
+                logger.debug("    Wins against: %s", self.names_of(closure.beats[emp_id], job_level))
+                logger.debug("    Losses to: %s", self.names_of(closure.beaten_by[emp_id], job_level))
+        return True
+
+    def record_rating(self, winner_id, loser_id, job_level):
+        """Rating mode: every vote counts, including repeats and contradictions"""
+        winner, loser = self.employees.ids.get(winner_id), self.employees.ids.get(loser_id)
+        if winner is None or loser is None:
+            logger.warning("Unknown employee in vote - %s vs %s", winner_id, loser_id)
+            return False
+        if winner == loser:
+            logger.warning("Employee voted against themselves - %s", winner_id)
+            return False
+        if job_level not in self.ratings or {self.employees.job_level(winner), self.employees.job_level(loser)} != {job_level}:
+            logger.warning("%s and %s are not both in %s", winner_id, loser_id, job_level)
+            return False
+        
+        local_ids = self.employees.local_ids
+        local_winner, local_loser = int(local_ids[winner]), int(local_ids[loser])
+        self.votes.append(pack(winner, loser, len(self.employees)))
+        model = self.ratings[job_level]
+        refitted = model.record(local_winner, local_loser)
+        # A refit moves everyone, so viewers get a reset rather than a delta
+        moved = None if refitted else [(winner_id, model.score(local_winner)), (loser_id, model.score(local_loser))]
+        self.touch(job_level, moved=moved)
+        logger.debug("Recording rated comparison %d: %s beat %s", len(self.votes), winner_id, loser_id)
+        return True
+
+    def touch(self, job_level, moved=None):
+        """Bump the version after a vote changed job_level's standings.
+        
+        moved lists the (employee, new score) pairs that changed; None means the
+        whole level may have changed.
+        """
+        self.version += 1
+        self.level_versions[job_level] = self.version
+        self.publish(job_level, moved)
+
+    def publish(self, job_level, moved=None):
+        """Tell listeners job_level changed as of the current version"""
+        if self.listeners:
+            event = {'version': self.version, 'job_level': job_level}
+            if moved is None:
+                event['reset'] = True
+            else:
+                event['moved'] = [{'employee': name, 'score': score} for name, score in moved]
+            for listener in self.listeners:
+                listener(event)
+
+    def init_level_rankings(self, job_level):
+        if job_level not in self.rankings:
+            # Initialize all employees in this job level with 0 wins
+            self.rankings[job_level] = Leaderboard(
+                [self.employees.names[emp] for emp in self.employees.level_members[job_level]]
+            )
+
+    def resolve_votes(self, votes, unknown):
+        """Map (winner, loser, job_level) votes to (vote, winner, loser) ids, listing invalid ones in unknown"""
+        ids = self.employees.ids
+        levels = self.ratings or self.closures
+        resolved = []
+        for vote in votes:
+            winner_id, loser_id, job_level = vote
+            winner, loser = ids.get(winner_id), ids.get(loser_id)
+            if (winner is None or loser is None or winner == loser or job_level not in levels
+                    or {self.employees.job_level(winner), self.employees.job_level(loser)} != {job_level}):
+                unknown.append(vote)
+                continue
+            resolved.append((vote, winner, loser))
+        return resolved
+
+    def level_edges(self, level_votes):
+        """Level-local (winner, loser) ids for (vote, winner, loser) entries"""
+        local_ids = self.employees.local_ids
+        return [(int(local_ids[winner]), int(local_ids[loser])) for _, winner, loser in level_votes]
+
+    def group_by_level(self, resolved):
+        new_votes = {}
+        for entry in resolved:
+            new_votes.setdefault(entry[0][2], []).append(entry)
+        return new_votes
+
+    @timed('vote_import')
+    def import_votes(self, votes):
+        """Apply many (winner, loser, job_level) votes exactly as recording them one by one would.
+        
+        Each job level's votes are checked in order against a scratch copy of its
+        closure, levels in parallel for large batches. Returns a report with the
+        accepted votes, duplicates (outcomes already known from earlier votes or
+        from earlier in the batch), votes naming unknown employees or mismatched
+        levels, and conflicts: accepted votes that contradicted a known outcome
+        and tied everyone on the cycle.
+        """
+        report = {'accepted': [], 'duplicates': [], 'unknown': [], 'conflicts': []}
+        resolved = self.resolve_votes(votes, report['unknown'])
+        
+        if self.ratings:
+            # Rating mode keeps every vote, as record_rating does
+            accepted = resolved
+        else:
+            # Batch positions of each level's votes, in order
+            positions = {}
+            for i, (vote, _, _) in enumerate(resolved):
+                positions.setdefault(vote[2], []).append(i)
+            job_levels = list(positions)
+            jobs = [
+                (closure.size, closure.beats, closure.beaten_by,
+                 self.level_edges([resolved[i] for i in positions[job_level]]))
+                for job_level, closure in zip(job_levels, map(self.closures.get, job_levels))
+            ]
+            results = parallel_map(
+                apply_votes, jobs, workers=self.workers,
+                total_size=sum(len(edges) for *_, edges in jobs)
+            )
+            kept, conflicts = set(), set()
+            for job_level, (beats, beaten_by, level_accepted, level_conflicts) in zip(job_levels, results):
+                # Update in place so the level's scheduler keeps seeing the same closure
+                closure = self.closures[job_level]
+                closure.beats, closure.beaten_by = beats, beaten_by
+                kept.update(positions[job_level][i] for i in level_accepted)
+                conflicts.update(positions[job_level][i] for i in level_conflicts)
+            accepted = [entry for i, entry in enumerate(resolved) if i in kept]
+            report['duplicates'] = [vote for i, (vote, _, _) in enumerate(resolved) if i not in kept]
+            report['conflicts'] = [vote for i, (vote, _, _) in enumerate(resolved) if i in conflicts]
+        
+        self.commit_batch(accepted)
+        report['accepted'] = [vote for vote, _, _ in accepted]
+        logger.info("Imported %d votes: %d duplicates, %d unknown, %d conflicts",
+                    len(report['accepted']), len(report['duplicates']), len(report['unknown']), len(report['conflicts']))
+        return report
+
+    @timed('vote_replay')
+    def replay_votes(self, votes):
+        """Re-apply votes this round accepted before, in order, e.g. from a journal or another worker.
+        
+        Every vote was accepted against the state it now lands on, so none are
+        checked again: each touched level is rebuilt once from all its votes.
+        The result, version included, is the same as recording them one by one.
+        """
+        unknown = []
+        resolved = self.resolve_votes(votes, unknown)
+        if unknown:
+            logger.warning("Skipped %d replayed votes that no longer match the roster", len(unknown))
+        
+        if not self.ratings:
+            size = len(self.employees)
+            local_ids = self.employees.local_ids
+            new_votes = self.group_by_level(resolved)
+            job_levels = list(new_votes)
+            jobs = []
+            winners, losers = unpack_array(self.votes, size)
+            for job_level in job_levels:
+                in_level = self.employees.level_codes[winners] == self.employees.levels.get_loc(job_level)
+                earlier = list(zip(local_ids[winners[in_level]].tolist(), local_ids[losers[in_level]].tolist()))
+                jobs.append((len(self.employees.level_members[job_level]), earlier + self.level_edges(new_votes[job_level]), len(earlier)))
+            results = parallel_map(
+                rebuild_closure, jobs, workers=self.workers,
+                total_size=sum(len(edges) for _, edges, _ in jobs)
+            )
+            for job_level, (beats, beaten_by, _) in zip(job_levels, results):
+                closure = self.closures[job_level]
+                closure.beats, closure.beaten_by = beats, beaten_by
+        
+        self.commit_batch(resolved)
+
+    def commit_batch(self, accepted):
+        """Log accepted (vote, winner, loser) entries in order and bring each touched level up to date.
+        
+        Versions advance one per vote in batch order, as they would vote by
+        vote, so equal vote sequences always give equal versions. Rating models
+        take their votes here; closures must already hold them.
+        """
+        size = len(self.employees)
+        for vote, winner, loser in accepted:
+            self.votes.append(pack(winner, loser, size))
+            self.version += 1
+            self.level_versions[vote[2]] = self.version
+        
+        for job_level, level_votes in self.group_by_level(accepted).items():
+            if self.ratings:
+                edges = self.level_edges(level_votes)
+                self.ratings[job_level].record_many([winner for winner, _ in edges], [loser for _, loser in edges])
+            else:
+                self.init_level_rankings(job_level)
+                closure = self.closures[job_level]
+                members = self.employees.level_members[job_level]
+                for emp in sorted(range(closure.size), key=closure.group_leader):
+                    name = self.employees.names[members[emp]]
+                    self.rankings[job_level].update(name, closure.win_count(emp))
+                    if closure.tied(emp):
+                        self.rankings[job_level].move_to_end(name)
+            self.publish(job_level)
+
+    def is_tied(self, winner_id, loser_id, job_level):
+        """Whether a recorded vote's employees ended up tied by contradictory votes"""
+        closure = self.closures.get(job_level)
+        winner, loser = self.employees.ids.get(winner_id), self.employees.ids.get(loser_id)
+        if closure is None or winner is None or loser is None:
+            return False
+        local_ids = self.employees.local_ids
+        return closure.is_tied(int(local_ids[winner]), int(local_ids[loser]))
+
+    def ties(self, job_level, names):
+        """Map each of names that is tied in job_level to the others in its tie group"""
+        closure = self.closures.get(job_level)
+        if closure is None:
+            return {}
+        ids, local_ids = self.employees.ids, self.employees.local_ids
+        ties = {}
+        for name in names:
+            emp = int(local_ids[ids[name]])
+            group = closure.tied(emp) & ~(1 << emp)
+            if group:
+                ties[name] = sorted(self.names_of(group, job_level))
+        return ties
+
+    def names_of(self, bits, job_level):
+        members = self.employees.level_members[job_level]
+        return {self.employees.names[members[emp]] for emp in iter_bits(bits)}
+
+    def filter_employees(self, job_level=None, location=None, min_experience=None):
+        return self.roster.filter_employees(job_level, location, min_experience)
+
+    @timed('prepare_clustering')
+    def prepare_clustering(self, filtered_df):
+        self.reset()
+        
+        # Build the integer-indexed employee table once per filter
+        from roster import EmployeeTable
+        self.employees = employees = EmployeeTable(filtered_df)
+        self.votes = pair_array(len(employees))
+        
+        # Job levels are independent partitions: each gets its own closure (or
+        # rating model) over level-local ids and its own scheduler
+        job_levels = list(employees.level_members)
+        # Adaptive pairing only needs each level's insertion order; the fixed
+        # strategies build their whole pair list up front. Both are a sort or
+        # two per level, cheaper inline than shipping the arrays to a pool.
+        if self.pairing == 'adaptive':
+            plans = [seed_order(employees.experience[employees.level_members[job_level]]) for job_level in job_levels]
+        else:
+            plans = [
+                plan_pairs(self.pairing, employees.experience[members], employees.location_codes[members])
+                for members in employees.level_members.values()
+            ]
+        
+        if self.mode != 'closure':
+            from rating import RATING_MODELS, RatingScheduler
+        for job_level, plan in zip(job_levels, plans):
+            size = len(employees.level_members[job_level])
+            if self.mode != 'closure':
+                model = self.ratings[job_level] = RATING_MODELS[self.mode](size)
+                decided, related = model.has_met, None
+            else:
+                closure = self.closures[job_level] = TransitiveClosure(size)
+                decided, related = closure.is_decided, closure.related
+            
+            if self.pairing != 'adaptive':
+                self.schedulers[job_level] = PairListScheduler(size, plan, decided, related)
+            elif self.mode != 'closure':
+                self.schedulers[job_level] = RatingScheduler(model, self.rating_budget)
+            else:
+                self.schedulers[job_level] = InsertionScheduler(plan.tolist(), closure)
+        
+        self.version += 1
+        self.level_versions = dict.fromkeys(job_levels, self.version)
+        
+        logger.debug("Employees to be ranked: %s",
+                     {job_level: len(scheduler) for job_level, scheduler in self.schedulers.items()})
+
+    def ranked_levels(self):
+        """Job levels that have at least one recorded vote"""
+        if self.ratings:
+            return [job_level for job_level, model in self.ratings.items() if len(model)]
+        return list(self.rankings)
+
+    def get_level_ranking(self, job_level, limit=None, offset=0):
+        """Return (employee, score) pairs for one job level, best first"""
+        if self.ratings:
+            names = self.employees.names
+            members = self.employees.level_members[job_level]
+            return [(names[members[emp]], score) for emp, score in self.ratings[job_level].ranked(limit, offset)]
+        return self.rankings[job_level].top(limit, offset)
+
+    def snapshot(self):
+        """The vote-derived state, for VoteJournal snapshots; the roster is rebuilt separately"""
+        return {field: getattr(self, field) for field in SNAPSHOT_FIELDS}
+
+    def restore(self, state):
+        for field, value in state.items():
+            setattr(self, field, value)
+
+    def get_rankings(self, limit=None, offset=0):
+        """Return the current rankings for all job levels, optionally one page of each"""
+        return {
+            job_level: self.get_level_ranking(job_level, limit, offset)
+            for job_level in self.ranked_levels()
+        }
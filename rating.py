@@ -0,0 +1,168 @@
+import math
+from array import array
+
+import numpy as np
+
+
+class BradleyTerry:
+    """Bradley-Terry strengths for one job level, for pools too large to fully order.
+
+    Contradictory votes are fine here: they just pull two strengths closer.
+    Votes are kept as two flat integer arrays, so memory is O(n + votes). Each
+    vote takes one logistic gradient step, and every refit_every votes a batch
+    minorise-maximise refit over all votes brings the scores back to the
+    maximum-likelihood fit.
+    """
+
+    learning_rate = 0.1
+    refit_every = 64
+
+    def __init__(self, size):
+        self.size = size
+        self.log_strength = np.zeros(size)
+        self.comparisons = np.zeros(size, dtype=np.int64)
+        self.opponents = [set() for _ in range(size)]
+        self.winners = array('I')
+        self.losers = array('I')
+
+    def __len__(self):
+        return len(self.winners)
+
+    def record(self, winner, loser):
+        """Add one vote. Returns True when it triggered a refit, which moves every score."""
+        self.winners.append(winner)
+        self.losers.append(loser)
+        self.comparisons[winner] += 1
+        self.comparisons[loser] += 1
+        self.opponents[winner].add(loser)
+        self.opponents[loser].add(winner)
+
+        # One online step on the logistic likelihood
+        theta = self.log_strength
+        surprise = 1.0 / (1.0 + math.exp(theta[winner] - theta[loser]))
+        theta[winner] += self.learning_rate * surprise
+        theta[loser] -= self.learning_rate * surprise
+
+        if len(self.winners) % self.refit_every == 0:
+            self.refit()
+            return True
+        return False
+
+    def record_many(self, winners, losers):
+        """Add a batch of votes exactly as record() would one at a time.
+
+        Scores must depend only on the vote sequence, not on whether it arrived
+        live, was imported or was replayed by another worker, so batches take
+        the same online steps and refit at the same vote counts.
+        """
+        for winner, loser in zip(winners, losers):
+            self.record(winner, loser)
+
+    def refit(self, iterations=100, tolerance=1e-6):
+        """Hunter's MM iterations over every vote, warm-started from the current scores.
+
+        Each employee also gets one pseudo-win and one pseudo-loss against a
+        virtual opponent of strength 1. That keeps unbeaten and winless employees
+        finite and anchors the scale.
+        """
+        if not self.winners:
+            return
+        winners = np.frombuffer(self.winners, dtype=np.uint32).astype(np.intp)
+        losers = np.frombuffer(self.losers, dtype=np.uint32).astype(np.intp)
+        wins = np.bincount(winners, minlength=self.size) + 1.0
+
+        strength = np.exp(self.log_strength)
+        for _ in range(iterations):
+            pair_weight = 1.0 / (strength[winners] + strength[losers])
+            denominator = (
+                np.bincount(winners, pair_weight, self.size)
+                + np.bincount(losers, pair_weight, self.size)
+                + 2.0 / (strength + 1.0)
+            )
+            updated = wins / denominator
+            converged = np.max(np.abs(np.log(updated) - np.log(strength))) < tolerance
+            strength = updated
+            if converged:
+                break
+        self.log_strength = np.log(strength)
+
+    def display(self, log_strength):
+        return round(float(log_strength), 2) + 0.0
+
+    def has_met(self, first, second):
+        return second in self.opponents[first]
+
+    def score(self, emp):
+        return self.display(self.log_strength[emp])
+
+    def ranked(self, limit=None, offset=0):
+        """Return (local id, score) pairs from rank offset on, best first"""
+        order = np.argsort(-self.log_strength, kind='stable')
+        end = None if limit is None else offset + limit
+        return [(int(emp), self.display(self.log_strength[emp])) for emp in order[offset:end]]
+
+
+class EloRating(BradleyTerry):
+    """The same model reported on the Elo scale, with the usual K=32 online update"""
+
+    learning_rate = 32 * math.log(10) / 400
+
+    def display(self, log_strength):
+        return int(round(1500 + 400 / math.log(10) * float(log_strength)))
+
+
+RATING_MODELS = {
+    'bradley-terry': BradleyTerry,
+    'elo': EloRating,
+}
+
+
+class RatingScheduler:
+    """Pair selection for rating mode.
+
+    The employee with the fewest comparisons so far is paired with the
+    closest-rated colleague they have not met yet. A level is finished once
+    everyone has been compared budget times, which defaults to
+    ceil(log2 n) + 1 rather than the ~n log n a full ordering needs.
+    """
+
+    def __init__(self, model, budget=None):
+        self.model = model
+        self.budget = budget or math.ceil(math.log2(max(model.size, 2))) + 1
+        self.exhausted = np.zeros(model.size, dtype=bool)
+
+    def __len__(self):
+        return self.model.size
+
+    def next_pair(self):
+        pairs = self.next_pairs(1)
+        return pairs[0] if pairs else None
+
+    def next_pairs(self, limit):
+        """Return up to limit pairs, no employee appearing twice in one batch"""
+        pairs = []
+        if self.model.size < 2:
+            return pairs
+        taken = np.zeros(self.model.size, dtype=bool)
+        while len(pairs) < limit:
+            counts = np.where(self.exhausted | taken, np.inf, self.model.comparisons)
+            emp = int(np.argmin(counts))
+            if counts[emp] >= self.budget:
+                break
+
+            gaps = np.abs(self.model.log_strength - self.model.log_strength[emp])
+            gaps[emp] = np.inf
+            gaps[list(self.model.opponents[emp])] = np.inf
+            if np.isinf(gaps).all():
+                # Already met everyone in the level
+                self.exhausted[emp] = True
+                continue
+            gaps[taken] = np.inf
+            opponent = int(np.argmin(gaps))
+            taken[emp] = True
+            if np.isinf(gaps[opponent]):
+                # Everyone left to meet is already busy in this batch
+                continue
+            taken[opponent] = True
+            pairs.append((emp, opponent))
+        return pairs
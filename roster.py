@@ -0,0 +1,210 @@
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from instrumentation import timed
+
+
+ROSTER_COLUMNS = ['Employee', 'Job_Level', 'Experience', 'Location']
+CATEGORY_COLUMNS = ['Job_Level', 'Location']
+CHUNK_SIZE = 100_000
+CACHE_DIR = '.roster_cache'
+
+
+# Rows named in an invalid-roster error before the rest are summarised
+MAX_REPORTED_ROWS = 10
+
+
+def parse_experience(values):
+    """Parse the Experience column as int16, raising ValueError that names the bad rows.
+
+    Row numbers are 1-based data rows (the CSV header is not counted); chunks
+    read from a file keep a running index, so they refer to the whole file.
+    """
+    years = pd.to_numeric(values, errors='coerce')
+    invalid = years.isna() | (years % 1 != 0) | (years < 0) | (years > np.iinfo(np.int16).max)
+    if invalid.any():
+        bad = values[invalid]
+        shown = ', '.join(f"{index + 1} ({value!r})" for index, value in bad.head(MAX_REPORTED_ROWS).items())
+        more = f" and {len(bad) - MAX_REPORTED_ROWS} more" if len(bad) > MAX_REPORTED_ROWS else ''
+        raise ValueError(f"Experience must be a whole number of years; invalid in roster rows {shown}{more}")
+    return years.astype('int16')
+
+
+def normalise_chunk(chunk):
+    """Strip stray whitespace and give one chunk of roster rows compact dtypes"""
+    chunk = chunk[ROSTER_COLUMNS]
+    return pd.DataFrame({
+        'Employee': chunk['Employee'].astype(str).str.strip(),
+        'Job_Level': chunk['Job_Level'].astype(str).str.strip().astype('category'),
+        'Experience': parse_experience(chunk['Experience']),
+        'Location': chunk['Location'].astype(str).str.strip().astype('category'),
+    })
+
+
+def combine_chunks(chunks):
+    """Concatenate normalised chunks, merging their category sets"""
+    if not chunks:
+        return normalise_chunk(pd.DataFrame(columns=ROSTER_COLUMNS))
+    combined = pd.concat(chunks, ignore_index=True)
+    for column in CATEGORY_COLUMNS:
+        combined[column] = union_categoricals([chunk[column] for chunk in chunks])
+    return combined
+
+
+def iter_roster_chunks(path, chunksize=CHUNK_SIZE):
+    """Stream raw roster rows from a CSV or Parquet file"""
+    if path.endswith('.parquet'):
+        # pyarrow is only needed for Parquet rosters
+        import pyarrow.parquet as pq
+        start = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=ROSTER_COLUMNS):
+            # Each batch starts at index 0; keep a running index like read_csv chunks
+            chunk = batch.to_pandas()
+            chunk.index += start
+            start += len(chunk)
+            yield chunk
+    else:
+        yield from pd.read_csv(path, usecols=ROSTER_COLUMNS, chunksize=chunksize, dtype=str)
+
+
+def load_roster(path=None, sample=None, chunksize=CHUNK_SIZE, cache_dir=CACHE_DIR):
+    """Load the roster from a CSV/Parquet file, or from the sample dict if no path is given.
+
+    Files are read in chunks and normalised as they stream in. The parsed frame
+    is pickled under cache_dir, keyed by the file's size and mtime, so a restart
+    against an unchanged roster skips parsing entirely.
+    """
+    if path is None:
+        return combine_chunks([normalise_chunk(pd.DataFrame(sample))])
+
+    stat = os.stat(path)
+    cache_name = f"{os.path.basename(path)}-{stat.st_size}-{stat.st_mtime_ns}.pkl"
+    cache_path = os.path.join(cache_dir, cache_name) if cache_dir else None
+    if cache_path and os.path.exists(cache_path):
+        return pd.read_pickle(cache_path)
+
+    roster_df = combine_chunks([normalise_chunk(chunk) for chunk in iter_roster_chunks(path, chunksize)])
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        roster_df.to_pickle(cache_path)
+    return roster_df
+
+# Experience bands per job level as (minimum years, band), highest band first.
+# The last band catches everything below; unlisted levels use the Junior table.
+EXPERIENCE_BANDS = {
+    'Senior': [(15, 'Senior-High'), (10, 'Senior-Mid'), (None, 'Senior-Low')],
+    'Mid-Level': [(8, 'Mid-High'), (5, 'Mid-Mid'), (None, 'Mid-Low')],
+    'Junior': [(3, 'Junior-High'), (1, 'Junior-Mid'), (None, 'Junior-Low')],
+}
+DEFAULT_BAND_LEVEL = 'Junior'
+FILTER_CACHE_SIZE = 32
+
+
+def assign_experience_bands(job_levels, experience):
+    """Vectorised lookup of EXPERIENCE_BANDS for parallel level/experience arrays"""
+    job_levels = np.asarray(job_levels, dtype=object)
+    experience = np.asarray(experience)
+    bands = np.empty(len(experience), dtype=object)
+    
+    other_levels = [level for level in EXPERIENCE_BANDS if level != DEFAULT_BAND_LEVEL]
+    for job_level, thresholds in EXPERIENCE_BANDS.items():
+        if job_level == DEFAULT_BAND_LEVEL:
+            mask = ~np.isin(job_levels, other_levels)
+        else:
+            mask = job_levels == job_level
+        level_exp = experience[mask]
+        bands[mask] = np.select(
+            [level_exp >= minimum for minimum, _ in thresholds[:-1]],
+            [band for _, band in thresholds[:-1]],
+            default=thresholds[-1][1]
+        )
+    return bands
+
+
+class Roster:
+    """Source roster shared by every review round, with cached filter results"""
+
+    def __init__(self, dataframe):
+        self.set_data(dataframe)
+
+    def set_data(self, dataframe):
+        """Swap the source roster and drop any filter results built from the old one"""
+        self.df = dataframe
+        self._filter_cache = {}
+
+    @timed('filter')
+    def filter_employees(self, job_level=None, location=None, min_experience=None):
+        # Filtered, banded frames are cached per filter key until set_data swaps the roster.
+        # Callers must treat the returned frame as read-only.
+        cache_key = (job_level, location, min_experience)
+        if cache_key in self._filter_cache:
+            return self._filter_cache[cache_key]
+        
+        # First level filtering
+        mask = np.ones(len(self.df), dtype=bool)
+        if location:
+            mask &= (self.df['Location'] == location).to_numpy()
+        if min_experience is not None:
+            mask &= (self.df['Experience'] >= min_experience).to_numpy()
+        filtered_df = self.df[mask]
+        
+        # Add experience band column within each job level
+        filtered_df = filtered_df.assign(Experience_Band=assign_experience_bands(
+            filtered_df['Job_Level'].to_numpy(), filtered_df['Experience'].to_numpy()
+        ))
+        
+        # Sort by experience within each band
+        filtered_df = filtered_df.sort_values(['Experience_Band', 'Experience'], ascending=[True, False])
+        
+        if len(self._filter_cache) >= FILTER_CACHE_SIZE:
+            self._filter_cache.pop(next(iter(self._filter_cache)))
+        self._filter_cache[cache_key] = filtered_df
+        return filtered_df
+
+
+class EmployeeTable:
+    """Integer-indexed, columnar view of a filtered roster.
+
+    Employee ids are row positions in the filtered DataFrame. Job levels and
+    locations are interned into small integer codes so the comparison hot path
+    never has to scan the DataFrame again.
+    """
+
+    def __init__(self, filtered_df):
+        self.names = list(filtered_df['Employee'])
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        self.level_codes, self.levels = pd.factorize(filtered_df['Job_Level'])
+        self.location_codes, self.locations = pd.factorize(filtered_df['Location'])
+        self.experience = filtered_df['Experience'].to_numpy()
+
+        # Employee ids grouped by job level in one stable sort, in roster order,
+        # plus each employee's position within its level
+        order = np.argsort(self.level_codes, kind='stable')
+        bounds = np.searchsorted(self.level_codes[order], np.arange(len(self.levels) + 1))
+        self.level_members = {
+            job_level: order[bounds[code]:bounds[code + 1]]
+            for code, job_level in enumerate(self.levels)
+        }
+        self.local_ids = np.empty(len(self.names), dtype=np.intp)
+        self.local_ids[order] = np.arange(len(order)) - bounds[self.level_codes[order]]
+
+    def __len__(self):
+        return len(self.names)
+
+    def job_level(self, emp):
+        return self.levels[self.level_codes[emp]]
+
+    def location(self, emp):
+        return self.locations[self.location_codes[emp]]
+
+    def row(self, emp):
+        """Materialise one employee as the dict the templates expect"""
+        return {
+            'Employee': self.names[emp],
+            'Job_Level': self.job_level(emp),
+            'Experience': int(self.experience[emp]),
+            'Location': self.location(emp),
+        }
@@ -0,0 +1,188 @@
+from pairs import pack, pair_array
+from partitioning import seed_order
+
+
+class InsertionScheduler:
+    """Adaptive pair selection for one job level by binary insertion.
+
+    Employees are inserted one at a time into an ordered list (best first).
+    Each insertion binary-searches the list, and every probe the closure can
+    already answer is skipped, so a human is only asked about pairs whose
+    outcome is still unknown. A full ordering of n employees therefore needs
+    close to ceil(log2 n!) questions.
+
+    Several candidates can be in flight at once for batched clients. They are
+    only ever compared with the ordered list, never with each other, so the
+    answer to one candidate's pair cannot decide another's.
+    """
+
+    def __init__(self, members, closure):
+        self.closure = closure
+        self.pending = list(reversed(members))
+        self.ordered = []
+        self.candidates = []
+
+    def __len__(self):
+        return len(self.ordered) + len(self.pending) + len(self.candidates)
+
+    def next_pair(self):
+        """Return the next undecided (candidate, opponent) pair, or None when done"""
+        pairs = self.next_pairs(1)
+        return pairs[0] if pairs else None
+
+    def next_pairs(self, limit):
+        """Return up to limit undecided pairs with independent outcomes, one per candidate"""
+        pairs = []
+        i = 0
+        while len(pairs) < limit:
+            if i == len(self.candidates):
+                if not self.pending:
+                    break
+                self.candidates.append(self.pending.pop())
+
+            candidate = self.candidates[i]
+            position, opponent = self.locate(candidate)
+            if opponent is not None:
+                pairs.append((candidate, opponent))
+                i += 1
+                continue
+
+            # Every probe was decided, so the candidate's slot is known
+            self.ordered.insert(position, candidate)
+            del self.candidates[i]
+        return pairs
+
+    def locate(self, emp):
+        """Binary-search emp's slot in the ordered list using known outcomes.
+
+        Returns (position, None) when the slot is fully determined, otherwise
+        (position, opponent) where opponent is the first undecided probe.
+        """
+        low, high = 0, len(self.ordered)
+        while low < high:
+            mid = (low + high) // 2
+            other = self.ordered[mid]
+            if self.closure.has_beaten(emp, other):
+                high = mid
+            elif self.closure.has_beaten(other, emp):
+                low = mid + 1
+            else:
+                return low, other
+        return low, None
+
+
+def only_self(emp):
+    """related() for rankings where a vote settles no pair but its own"""
+    return 1 << emp
+
+
+class PairListScheduler:
+    """Walks a precomputed list of level-local pairs in order.
+
+    Pairs whose outcome decided(first, second) already knows are skipped, so
+    with a transitive closure every vote can retire several later pairs.
+    Pairs are only consumed once decided, which keeps repeated fetches of the
+    same batch stable.
+
+    related(emp) gives the bits of the employees whose order against emp is
+    known. A batch only takes pairs whose employees are unrelated to everyone
+    already in it, so no answer in the batch can decide another of its pairs,
+    even through the closure. Without related, as for rating models where a
+    vote only settles its own pair, batch pairs just share no employee.
+    """
+
+    def __init__(self, size, pairs, decided, related=None):
+        self.size = size
+        self.pairs = pair_array(size)
+        self.pairs.extend(pack(first, second, size) for first, second in pairs)
+        self.decided = decided
+        # Bound methods and module functions only, so snapshots can pickle it
+        self.related = related or only_self
+        self.index = 0
+
+    def __len__(self):
+        return self.size
+
+    def next_pair(self):
+        pairs = self.next_pairs(1)
+        return pairs[0] if pairs else None
+
+    def next_pairs(self, limit):
+        pairs = []
+        # Everyone related to an employee in the batch
+        busy = 0
+        i = self.index
+        while i < len(self.pairs) and len(pairs) < limit:
+            first, second = divmod(self.pairs[i], self.size)
+            i += 1
+            if self.decided(first, second):
+                # Decisions never go away, so a decided head is done for good
+                if i == self.index + 1:
+                    self.index = i
+                continue
+            if (busy >> first) & 1 or (busy >> second) & 1:
+                # Left for a later batch, once this one's answers are in
+                continue
+            busy |= self.related(first) | self.related(second)
+            pairs.append((first, second))
+        return pairs
+
+def unique_pairs(pairs):
+    """Drop self-comparisons and repeats (in either order), keeping first occurrences"""
+    seen = set()
+    result = []
+    for first, second in pairs:
+        first, second = int(first), int(second)
+        key = (min(first, second), max(first, second))
+        if first != second and key not in seen:
+            seen.add(key)
+            result.append((first, second))
+    return result
+
+
+def midpoint_pairs(experience, location_codes):
+    """The low_comparison schedule: neighbours by experience, plus first vs third
+    and the two employees either side of the middle"""
+    employees = seed_order(experience).tolist()
+    pairs = list(zip(employees, employees[1:]))
+    if len(employees) > 2:
+        pairs.append((employees[0], employees[2]))
+    if len(employees) > 3:
+        mid = len(employees) // 2
+        pairs.append((employees[mid - 1], employees[mid + 1]))
+    return unique_pairs(pairs)
+
+
+def location_heuristic_pairs(experience, location_codes):
+    """The original app schedule: experience neighbours within each location,
+    every second employee, then the top two across neighbouring locations"""
+    import numpy as np
+    by_location = []
+    for location in dict.fromkeys(location_codes.tolist()):
+        members = np.flatnonzero(location_codes == location)
+        by_location.append(members[seed_order(experience[members])].tolist())
+
+    pairs = []
+    for employees in by_location:
+        pairs.extend(zip(employees, employees[1:]))
+        if len(employees) > 2:
+            pairs.append((employees[0], employees[2]))
+            pairs.extend((employees[i], employees[i + 2]) for i in range(0, len(employees) - 2, 2))
+    for first, second in zip(by_location, by_location[1:]):
+        pairs.append((first[0], second[0]))
+        if len(first) > 1 and len(second) > 1:
+            pairs.append((first[1], second[1]))
+    return unique_pairs(pairs)
+
+
+# Fixed pair lists selectable instead of adaptive insertion; each takes one
+# job level's experience and location codes and returns level-local pairs
+PAIR_LISTS = {
+    'midpoint': midpoint_pairs,
+    'location-heuristic': location_heuristic_pairs,
+}
+
+
+def plan_pairs(pairing, experience, location_codes):
+    """Build one level's pair list with the named strategy"""
+    return PAIR_LISTS[pairing](experience, location_codes)
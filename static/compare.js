@@ -0,0 +1,103 @@
+// Answer comparisons without page reloads: fetch a batch of independent pairs,
+// let the reviewer answer them locally, then send all the votes in one request
+// that also returns the next batch. Without JavaScript the plain form still works.
+(function () {
+    const form = document.querySelector('form[data-votes-url]');
+    if (!form || !window.fetch) {
+        return;
+    }
+    const BATCH = 10;
+    const cards = form.querySelectorAll('.employee-card');
+    const status = form.querySelector('[data-status]');
+    let queue = [];
+    let votes = [];
+    // The round's version when the queued pairs were handed out
+    let version = null;
+
+    function show(pair) {
+        form.querySelector('input[name="job_level"]').value = pair.job_level;
+        pair.employees.forEach(function (employee, i) {
+            const card = cards[i];
+            card.querySelectorAll('[data-field]').forEach(function (field) {
+                field.textContent = employee[field.dataset.field];
+            });
+            card.querySelector('button[name="winner"]').value = employee.Employee;
+            card.querySelector('input[name="loser"]').value = pair.employees[1 - i].Employee;
+        });
+    }
+
+    function setWaiting(waiting) {
+        form.querySelectorAll('button[name="winner"]').forEach(function (button) {
+            button.disabled = waiting;
+        });
+    }
+
+    function receive(response) {
+        if (!response.ok) {
+            throw new Error('Comparison API returned ' + response.status);
+        }
+        return response.json().then(function (body) {
+            queue = body.pairs;
+            version = body.version;
+            if (!queue.length) {
+                window.location = body.rankings_url;
+                return;
+            }
+            show(queue[0]);
+        });
+    }
+
+    function fallback() {
+        // Nothing answered yet, so the server-rendered pair is still current:
+        // let the next click go through the regular form post
+        form.removeEventListener('submit', answer);
+    }
+
+    function send() {
+        // Votes stay queued until the server confirms them. A retry sends the
+        // same version, so if the lost response was for an applied batch the
+        // server sees the round has moved on and does not apply it again
+        status.hidden = true;
+        setWaiting(true);
+        fetch(form.dataset.votesUrl, {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({votes: votes, next: BATCH, version: version})
+        }).then(function (response) {
+            return receive(response).then(function () {
+                votes = [];
+                setWaiting(false);
+            });
+        }).catch(function () {
+            status.querySelector('[data-status-text]').textContent =
+                'Your last ' + votes.length + ' answers could not be saved.';
+            status.hidden = false;
+        });
+    }
+
+    function answer(event) {
+        const winner = event.submitter;
+        if (!winner) {
+            return;
+        }
+        // The shown pair belongs to the batch client now, never to a form post
+        event.preventDefault();
+        if (!queue.length) {
+            return;
+        }
+        const pair = queue.shift();
+        const loser = pair.employees.find(function (employee) {
+            return employee.Employee !== winner.value;
+        });
+        votes.push({winner: winner.value, loser: loser.Employee, job_level: pair.job_level});
+        if (queue.length) {
+            show(queue[0]);
+            return;
+        }
+        send();
+    }
+
+    status.querySelector('[data-retry]').addEventListener('click', send);
+    form.addEventListener('submit', answer);
+    fetch(form.dataset.pairsUrl + '?count=' + BATCH).then(receive).catch(fallback);
+})();
@@ -0,0 +1,51 @@
+// Keep the rankings page live: apply the deltas pushed by /rankings/stream and
+// reload only when the server says the page is too far out of date.
+(function () {
+    const container = document.querySelector('[data-stream-url]');
+    if (!container || !window.EventSource) {
+        return;
+    }
+    let version = Number(container.dataset.version);
+    const source = new EventSource(container.dataset.streamUrl);
+
+    function reload() {
+        source.close();
+        window.location.reload();
+    }
+
+    source.addEventListener('reset', reload);
+    source.addEventListener('delta', function (message) {
+        const event = JSON.parse(message.data);
+        if (event.version <= version) {
+            return;
+        }
+        version = event.version;
+
+        // A paged view or a level's first vote can change which rows are shown
+        const section = Array.from(container.querySelectorAll('[data-job-level]')).find(function (element) {
+            return element.dataset.jobLevel === event.job_level;
+        });
+        if (!section || 'paged' in container.dataset) {
+            reload();
+            return;
+        }
+
+        const items = Array.from(section.querySelectorAll('[data-employee]'));
+        event.moved.forEach(function (change) {
+            const item = items.find(function (element) {
+                return element.dataset.employee === change.employee;
+            });
+            if (item) {
+                item.dataset.score = change.score;
+                item.querySelector('.points').textContent = change.score;
+            }
+        });
+        items.sort(function (a, b) {
+            return Number(b.dataset.score) - Number(a.dataset.score);
+        });
+        items.forEach(function (item, i) {
+            section.appendChild(item);
+            item.querySelector('.rank').textContent = '#' + (i + 1) + ':';
+        });
+    });
+})();
@@ -0,0 +1,254 @@
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+# Catch-up replays longer than this go through one batch import instead of vote by vote
+REPLAY_BATCH_MIN = 32
+
+
+def replay(ranking, votes):
+    """Re-apply previously accepted votes, through one batch rebuild when there are many"""
+    if len(votes) > REPLAY_BATCH_MIN:
+        ranking.replay_votes(votes)
+    else:
+        for vote in votes:
+            ranking.record_comparison(*vote)
+
+
+class LRUCache:
+    """Thread-safe mapping that evicts the least recently used entry"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+    def pop(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+
+class Backend:
+    """What every session backend shares: an LRU of live rankings and the vote paths.
+
+    Subclasses implement start_round, load and write(round_id, ranking,
+    apply_votes), which applies votes under the ranking's lock and makes the
+    accepted ones durable, returning them.
+    """
+
+    def __init__(self, build_round, capacity=128):
+        self.build_round = build_round
+        self.rounds = LRUCache(capacity)
+
+    def store(self, round_id, ranking, apply_votes):
+        """Apply votes and store the accepted ones, returning them"""
+        with ranking.lock:
+            try:
+                return self.write(round_id, ranking, apply_votes)
+            except Exception:
+                # The local copy may be ahead of the stored votes now, so rebuild it next time
+                self.evict(round_id)
+                raise
+
+    def evict(self, round_id):
+        self.rounds.pop(round_id)
+
+    def record_vote(self, round_id, ranking, winner_id, loser_id, job_level):
+        self.record_votes(round_id, ranking, [(winner_id, loser_id, job_level)])
+
+    def record_votes(self, round_id, ranking, votes, version=None):
+        """Store a batch of interactive votes, returning the accepted ones.
+
+        version is the round's version the batch was answered against. Once the
+        round has moved past it, e.g. because a retry repeats a batch whose
+        response was lost, nothing is applied and None is returned.
+        """
+        result = {}
+        def apply_votes():
+            # Checked after catching up, so every worker sees the same version
+            if version is not None and ranking.version != version:
+                return []
+            result['accepted'] = [vote for vote in votes if ranking.record_comparison(*vote)]
+            return result['accepted']
+        self.store(round_id, ranking, apply_votes)
+        return result.get('accepted')
+
+    def import_votes(self, round_id, ranking, votes):
+        report = {}
+        def apply_votes():
+            report.update(ranking.import_votes(votes))
+            return report['accepted']
+        self.store(round_id, ranking, apply_votes)
+        return report
+
+
+class MemoryBackend(Backend):
+    """Keeps each review round's EmployeeRanking in process memory.
+
+    Rounds are independent, so concurrent reviewers no longer share state.
+    With a VoteJournal (journal.py), accepted votes are also logged to disk,
+    and rounds missing from memory, after a restart, an LRU eviction or in
+    another worker, are recovered from it. Workers sharing a journal replay
+    each other's votes before applying their own, like SQLiteBackend.catch_up.
+    Without a journal, rounds are not visible to other workers.
+    """
+
+    def __init__(self, build_round, capacity=128, journal=None):
+        super().__init__(build_round, capacity)
+        self.journal = journal
+        self.recover_lock = threading.Lock()
+
+    def start_round(self, round_id, filters):
+        ranking = self.build_round(round_id, filters)
+        if self.journal is not None:
+            self.journal.start_round(round_id, filters, ranking)
+        self.rounds.put(round_id, ranking)
+        return ranking
+
+    def load(self, round_id):
+        ranking = self.rounds.get(round_id)
+        if ranking is None and self.journal is not None:
+            with self.recover_lock:
+                ranking = self.rounds.get(round_id)
+                if ranking is None:
+                    ranking = self.journal.recover(round_id, self.build_round, replay)
+                    if ranking is not None:
+                        self.rounds.put(round_id, ranking)
+        elif ranking is not None and self.journal is not None:
+            with ranking.lock:
+                self.journal.catch_up(round_id, ranking, replay)
+        return ranking
+
+    def write(self, round_id, ranking, apply_votes):
+        if self.journal is None:
+            return apply_votes()
+        return self.journal.append(round_id, ranking, apply_votes, replay)
+
+    def evict(self, round_id):
+        # Without a journal the live copy is the only one, so it has to stay
+        if self.journal is not None:
+            super().evict(round_id)
+
+
+class SQLiteBackend(Backend):
+    """Persists review rounds to SQLite so they survive restarts and are shared
+    between worker processes.
+
+    Only the round's filters and one row per accepted vote are stored. Each
+    worker keeps its own LRU of rebuilt rankings and replays just the votes it
+    has not seen.
+    """
+
+    def __init__(self, build_round, path, capacity=128):
+        super().__init__(build_round, capacity)
+        self.path = path
+        self.local = threading.local()
+        with self.connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS rounds ('
+                ' round_id TEXT PRIMARY KEY,'
+                ' filters TEXT NOT NULL)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS votes ('
+                ' round_id TEXT NOT NULL,'
+                ' seq INTEGER NOT NULL,'
+                ' winner TEXT NOT NULL,'
+                ' loser TEXT NOT NULL,'
+                ' job_level TEXT NOT NULL,'
+                ' PRIMARY KEY (round_id, seq))'
+            )
+
+    def connect(self):
+        # Connections must not cross a fork, e.g. from a preloading gunicorn master
+        conn = getattr(self.local, 'conn', None)
+        if conn is None or self.local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self.local.conn = conn
+            self.local.pid = os.getpid()
+        return conn
+
+    def start_round(self, round_id, filters):
+        self.connect().execute(
+            'INSERT OR REPLACE INTO rounds (round_id, filters) VALUES (?, ?)',
+            (round_id, json.dumps(filters))
+        )
+        ranking = self.build_round(round_id, filters)
+        self.rounds.put(round_id, ranking)
+        return ranking
+
+    def load(self, round_id):
+        ranking = self.rounds.get(round_id)
+        if ranking is None:
+            row = self.connect().execute(
+                'SELECT filters FROM rounds WHERE round_id = ?', (round_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            ranking = self.build_round(round_id, json.loads(row[0]))
+            self.rounds.put(round_id, ranking)
+        with ranking.lock:
+            self.catch_up(round_id, ranking)
+        return ranking
+
+    def catch_up(self, round_id, ranking):
+        """Apply votes other workers stored since this worker last looked"""
+        rows = self.connect().execute(
+            'SELECT seq, winner, loser, job_level FROM votes'
+            ' WHERE round_id = ? AND seq > ? ORDER BY seq',
+            (round_id, ranking.applied_seq)
+        ).fetchall()
+        replay(ranking, [row[1:] for row in rows])
+        if rows:
+            ranking.applied_seq = rows[-1][0]
+
+    def write(self, round_id, ranking, apply_votes):
+        """Apply votes locally and append the accepted ones to the round's log.
+
+        The write lock is held throughout so votes are stored in the order every
+        worker will apply them. Only accepted votes are stored, so repeats never
+        reach the log and batch and one-by-one replay agree.
+        """
+        conn = self.connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            self.catch_up(round_id, ranking)
+            accepted = apply_votes()
+            conn.executemany(
+                'INSERT INTO votes (round_id, seq, winner, loser, job_level)'
+                ' VALUES (?, ?, ?, ?, ?)',
+                [(round_id, ranking.applied_seq + i + 1, *vote) for i, vote in enumerate(accepted)]
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        ranking.applied_seq += len(accepted)
+        return accepted
+
+
+def create_backend(kind, build_round, **options):
+    """Build the session backend named by RANKING_BACKEND ('memory' or 'sqlite')"""
+    if kind == 'memory':
+        return MemoryBackend(build_round, **options)
+    if kind == 'sqlite':
+        return SQLiteBackend(build_round, **options)
+    raise ValueError(f"Unknown ranking backend: {kind}")
@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+
+# The app is a set of top-level modules, so make them importable from tests/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def build_round():
+    """Rounds over the sample roster, built the way the app builds them"""
+    import app
+    return app.build_round
+
+
+@pytest.fixture
+def settings():
+    return {'location': None, 'min_experience': None, 'mode': 'closure', 'pairing': 'adaptive'}
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    """A test client on a fresh memory backend journalling under tmp_path"""
+    import app
+    monkeypatch.setenv('RANKING_BACKEND', 'memory')
+    monkeypatch.setenv('RANKING_JOURNAL', str(tmp_path / 'journal'))
+    monkeypatch.delitem(app._state, 'backend', raising=False)
+    test_client = app.create_app().test_client()
+    test_client.post('/', data={'location': 'all', 'min_experience': '0'})
+    return test_client
@@ -0,0 +1,34 @@
+"""Helpers shared by the tests: simulated reviewers over the sample roster"""
+import random
+
+
+def answer(pair):
+    """The vote a reviewer who prefers experience gives for a (row, row) pair"""
+    first, second = pair
+    winner, loser = (first, second) if first['Experience'] >= second['Experience'] else (second, first)
+    return winner['Employee'], loser['Employee'], winner['Job_Level']
+
+
+def vote_by_experience(ranking, limit=1000):
+    """Answer the ranking's pairs until it is done; returns the votes"""
+    votes = []
+    while len(votes) < limit:
+        pair = ranking.get_next_pair()
+        if pair is None:
+            break
+        vote = answer(pair)
+        assert ranking.record_comparison(*vote)
+        votes.append(vote)
+    return votes
+
+
+def random_votes(ranking, count, seed=0):
+    """Votes between random colleagues, including repeats and contradictions"""
+    rng = random.Random(seed)
+    employees = ranking.employees
+    votes = []
+    for _ in range(count):
+        members = employees.level_members[rng.choice(list(employees.level_members))]
+        winner, loser = rng.sample(list(members), 2)
+        votes.append((employees.names[winner], employees.names[loser], employees.job_level(winner)))
+    return votes
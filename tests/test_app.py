@@ -0,0 +1,86 @@
+import app
+from support import answer
+
+
+def post_votes(client, pairs):
+    votes = [dict(zip(('winner', 'loser', 'job_level'), answer(record['employees']))) for record in pairs]
+    return client.post('/api/votes', json={'votes': votes, 'next': 1})
+
+
+def test_rankings_are_revalidated_by_version(client):
+    pairs = client.get('/api/pairs?count=1').get_json()['pairs']
+    pairs = post_votes(client, pairs).get_json()['pairs']
+    first = client.get('/rankings')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert client.get('/rankings', headers={'If-None-Match': etag}).status_code == 304
+
+    assert post_votes(client, pairs).get_json()['applied'] == 1
+    second = client.get('/rankings', headers={'If-None-Match': etag})
+    assert second.status_code == 200
+    assert second.headers['ETag'] != etag
+    assert client.get('/rankings', headers={'If-None-Match': second.headers['ETag']}).status_code == 304
+
+
+def test_fragments_are_not_shared_between_copies_of_a_round(build_round, settings):
+    # Two copies of one round at the same level version but with opposite votes,
+    # as after a round is evicted and reloaded without a vote that failed to store
+    first, second = build_round('round', settings), build_round('round', settings)
+    winner, loser, job_level = answer(first.get_next_pair())
+    assert first.record_comparison(winner, loser, job_level)
+    assert second.record_comparison(loser, winner, job_level)
+    assert first.level_versions[job_level] == second.level_versions[job_level]
+
+    with app.create_app().test_request_context():
+        stale = app.render_level('round', first, job_level, None, 0)
+        fresh = app.render_level('round', second, job_level, None, 0)
+    assert fresh != stale
+    assert fresh.index(loser) < fresh.index(winner)
+
+
+def test_votes_must_name_employees_by_string(client):
+    pairs = client.get('/api/pairs?count=1').get_json()['pairs']
+    winner, loser, job_level = answer(pairs[0]['employees'])
+    for vote in ({'winner': [winner], 'loser': loser, 'job_level': job_level},
+                 {'winner': winner, 'loser': {'name': loser}, 'job_level': job_level},
+                 {'winner': winner, 'loser': loser, 'job_level': 3}):
+        assert client.post('/api/votes', json={'votes': [vote]}).status_code == 400
+        assert client.post('/votes/import', json=[vote]).status_code == 400
+    assert client.post('/votes/import', json=[{'winner': winner, 'loser': loser, 'job_level': job_level}]).get_json()['applied'] == 1
+
+
+def test_self_votes_are_rejected(build_round, settings):
+    for mode in ('closure', 'elo'):
+        ranking = build_round('round', dict(settings, mode=mode))
+        name = ranking.employees.names[0]
+        assert not ranking.record_comparison(name, name, ranking.employees.job_level(0))
+        assert len(ranking.votes) == 0
+
+
+def test_a_retried_batch_is_applied_once(client):
+    # Rating modes count repeated outcomes, so only the version guards a retry
+    client.post('/', data={'location': 'all', 'min_experience': '0', 'ranking_mode': 'elo'})
+    body = client.get('/api/pairs?count=4').get_json()
+    votes = [dict(zip(('winner', 'loser', 'job_level'), answer(record['employees']))) for record in body['pairs']]
+    batch = {'votes': votes, 'next': 4, 'version': body['version']}
+
+    first = client.post('/api/votes', json=batch).get_json()
+    assert first['applied'] == len(votes) and not first['stale']
+    assert first['version'] == body['version'] + len(votes)
+    retry = client.post('/api/votes', json=batch).get_json()
+    assert retry['applied'] == 0 and retry['stale']
+    assert retry['version'] == first['version']
+    with client.session_transaction() as session:
+        assert len(app.get_backend().load(session['round_id']).votes) == len(votes)
+
+
+def test_closing_an_unread_stream_unsubscribes(client):
+    from werkzeug.test import EnvironBuilder
+    from events import broadcaster
+    with client.session_transaction() as session:
+        environ = EnvironBuilder(path='/rankings/stream', query_string={'round': session['round_id']}).get_environ()
+    # What a WSGI server does when the viewer leaves before the first chunk
+    body = client.application.wsgi_app(environ, lambda status, headers: None)
+    assert broadcaster.subscriptions
+    body.close()
+    assert not broadcaster.subscriptions
@@ -0,0 +1,98 @@
+import random
+
+from closure import TransitiveClosure, apply_votes, iter_bits, rebuild_closure
+
+
+def reachability(size, edges):
+    """Brute-force transitive closure as bitsets"""
+    reach = [[False] * size for _ in range(size)]
+    for winner, loser in edges:
+        reach[winner][loser] = True
+    for middle in range(size):
+        for first in range(size):
+            if reach[first][middle]:
+                for last in range(size):
+                    if reach[middle][last]:
+                        reach[first][last] = True
+    return [sum(1 << j for j in range(size) if reach[i][j]) for i in range(size)]
+
+
+def random_votes(rng, closure, count):
+    """Votes the engine would accept, with plenty of contradictions"""
+    edges = []
+    for _ in range(count):
+        winner, loser = rng.sample(range(closure.size), 2)
+        if not closure.has_beaten(winner, loser):
+            edges.append((winner, loser))
+            closure.add(winner, loser)
+    return edges
+
+
+def test_incremental_matches_brute_force():
+    rng = random.Random(0)
+    for _ in range(500):
+        size = rng.randint(2, 12)
+        closure = TransitiveClosure(size)
+        edges = random_votes(rng, closure, rng.randint(0, 30))
+        assert closure.beats == reachability(size, edges)
+        assert closure.beaten_by == [
+            sum(1 << i for i in range(size) if (closure.beats[i] >> j) & 1) for j in range(size)
+        ]
+
+
+def test_add_reports_every_changed_win_count():
+    rng = random.Random(1)
+    for _ in range(500):
+        size = rng.randint(2, 10)
+        closure = TransitiveClosure(size)
+        for _ in range(25):
+            winner, loser = rng.sample(range(size), 2)
+            before = [closure.win_count(emp) for emp in range(size)]
+            changed = closure.add(winner, loser)
+            after = [closure.win_count(emp) for emp in range(size)]
+            assert {emp for emp in range(size) if before[emp] != after[emp]} <= set(changed)
+
+
+def test_batch_engines_match_incremental():
+    rng = random.Random(2)
+    for _ in range(500):
+        size = rng.randint(2, 12)
+        closure = TransitiveClosure(size)
+        edges = random_votes(rng, closure, rng.randint(0, 30))
+        first_new = rng.randint(0, len(edges))
+
+        # A trusted replay rebuilds from every vote at once
+        beats, beaten_by, tied = rebuild_closure((size, edges, first_new))
+        assert (beats, beaten_by) == (closure.beats, closure.beaten_by)
+        assert tied == [i for i in range(first_new, len(edges)) if closure.is_tied(*edges[i])]
+
+        # An import re-checks each new vote, so implied ones are skipped
+        start = TransitiveClosure(size)
+        for edge in edges[:first_new]:
+            start.add(*edge)
+        batch = edges[first_new:] + [tuple(rng.sample(range(size), 2)) for _ in range(10)]
+        beats, beaten_by, accepted, _ = apply_votes((size, start.beats, start.beaten_by, batch))
+        expected = TransitiveClosure(size)
+        expected.beats, expected.beaten_by = list(start.beats), list(start.beaten_by)
+        expected_accepted = []
+        for i, (winner, loser) in enumerate(batch):
+            if not expected.has_beaten(winner, loser):
+                expected.add(winner, loser)
+                expected_accepted.append(i)
+        assert accepted == expected_accepted
+        assert (beats, beaten_by) == (expected.beats, expected.beaten_by)
+
+
+def test_cycle_collapses_into_tie_group():
+    closure = TransitiveClosure(4)
+    closure.add(0, 1)
+    closure.add(1, 2)
+    closure.add(2, 3)
+    assert [closure.win_count(emp) for emp in range(4)] == [3, 2, 1, 0]
+
+    # 2 > 0 contradicts 0 > 1 > 2, so 0, 1 and 2 become one group above 3
+    assert sorted(closure.add(2, 0)) == [0, 1, 2]
+    assert list(iter_bits(closure.tied(1))) == [0, 1, 2]
+    assert closure.tied(3) == 0
+    assert [closure.win_count(emp) for emp in range(4)] == [1, 1, 1, 0]
+    assert {closure.group_leader(emp) for emp in range(3)} == {0}
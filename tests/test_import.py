@@ -0,0 +1,60 @@
+import pytest
+
+from storage import REPLAY_BATCH_MIN, replay
+from support import random_votes
+
+
+def level_names(ranking, job_level, count):
+    members = ranking.employees.level_members[job_level]
+    return [ranking.employees.names[emp] for emp in members[:count]]
+
+
+def state(ranking):
+    return ranking.version, dict(ranking.level_versions), list(ranking.votes), ranking.get_rankings()
+
+
+def test_report_categories(build_round, settings):
+    ranking = build_round('round', settings)
+    a, b, c = level_names(ranking, 'Senior', 3)
+    junior = level_names(ranking, 'Junior', 1)[0]
+    report = ranking.import_votes([
+        (a, b, 'Senior'),
+        (b, c, 'Senior'),
+        (a, c, 'Senior'),       # implied by the two before it
+        (a, b, 'Senior'),       # a repeat
+        (c, a, 'Senior'),       # contradicts a > b > c, tying all three
+        (a, a, 'Senior'),       # a self-vote
+        ('Nobody', a, 'Senior'),
+        (a, junior, 'Senior'),  # different job levels
+    ])
+    assert report['accepted'] == [(a, b, 'Senior'), (b, c, 'Senior'), (c, a, 'Senior')]
+    assert report['duplicates'] == [(a, c, 'Senior'), (a, b, 'Senior')]
+    assert report['conflicts'] == [(c, a, 'Senior')]
+    assert report['unknown'] == [(a, a, 'Senior'), ('Nobody', a, 'Senior'), (a, junior, 'Senior')]
+    assert ranking.ties('Senior', [a]) == {a: sorted([b, c])}
+
+
+@pytest.mark.parametrize('mode', ['closure', 'elo'])
+def test_import_matches_one_by_one(build_round, settings, mode):
+    imported = build_round('imported', dict(settings, mode=mode))
+    votes = random_votes(imported, 300)
+    report = imported.import_votes(votes)
+
+    recorded = build_round('recorded', dict(settings, mode=mode))
+    assert [vote for vote in votes if recorded.record_comparison(*vote)] == report['accepted']
+    assert state(imported) == state(recorded)
+
+
+@pytest.mark.parametrize('mode', ['closure', 'elo'])
+def test_replaying_accepted_votes_gives_the_same_version(build_round, settings, mode):
+    live = build_round('live', dict(settings, mode=mode))
+    accepted = live.import_votes(random_votes(live, 300))['accepted']
+    assert len(accepted) > REPLAY_BATCH_MIN
+
+    # Catch up in a long batch and vote by vote in short tails, as workers do
+    batched = build_round('batched', dict(settings, mode=mode))
+    replay(batched, accepted)
+    tails = build_round('tails', dict(settings, mode=mode))
+    for start in range(0, len(accepted), REPLAY_BATCH_MIN):
+        replay(tails, accepted[start:start + REPLAY_BATCH_MIN])
+    assert state(batched) == state(tails) == state(live)
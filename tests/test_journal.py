@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+from journal import VoteJournal
+from storage import MemoryBackend
+from support import answer
+
+
+def backend(build_round, directory, snapshot_every=1000):
+    return MemoryBackend(build_round, journal=VoteJournal(str(directory), snapshot_every=snapshot_every))
+
+
+def play(workers, round_id):
+    """Vote through the workers in turn until the round is done; returns the pairs asked"""
+    asked = []
+    while True:
+        worker = workers[len(asked) % len(workers)]
+        ranking = worker.load(round_id)
+        with ranking.lock:
+            pair = ranking.get_next_pair()
+        if pair is None:
+            return asked
+        vote = answer(pair)
+        asked.append(frozenset(vote[:2]))
+        worker.record_vote(round_id, ranking, *vote)
+
+
+def test_recovery_matches_live_round(tmp_path, build_round, settings):
+    # 1000 recovers by full replay, 7 from a snapshot plus a short tail
+    for snapshot_every in (1000, 7):
+        live = backend(build_round, tmp_path, snapshot_every)
+        ranking = live.start_round('round', settings)
+        play([live], 'round')
+
+        recovered = backend(build_round, tmp_path, snapshot_every).load('round')
+        assert list(recovered.votes) == list(ranking.votes)
+        assert recovered.get_rankings() == ranking.get_rankings()
+        assert recovered.journal_seq == len(ranking.votes)
+
+
+def test_torn_final_line_is_dropped(tmp_path, build_round, settings):
+    live = backend(build_round, tmp_path)
+    ranking = live.start_round('round', settings)
+    play([live], 'round')
+    path = os.path.join(tmp_path, 'round.ndjson')
+    with open(path, 'a') as f:
+        f.write('["half a vote"')
+
+    recovered = backend(build_round, tmp_path).load('round')
+    assert recovered.get_rankings() == ranking.get_rankings()
+    with open(path, 'rb') as f:
+        assert f.read().endswith(b'\n')
+
+
+def test_workers_sharing_a_journal_see_each_others_votes(tmp_path, build_round, settings):
+    for mode in ('closure', 'elo'):
+        workers = [backend(build_round, tmp_path, snapshot_every=5) for _ in range(2)]
+        workers[0].start_round('round', dict(settings, mode=mode))
+        asked = play(workers, 'round')
+
+        assert len(asked) == len(set(asked))
+        fresh = backend(build_round, tmp_path).load('round')
+        assert len(fresh.votes) == len(asked)
+        rankings = [worker.load('round').get_rankings() for worker in workers]
+        assert rankings[0] == rankings[1] == fresh.get_rankings()
+
+
+def test_a_failed_append_evicts_the_round(tmp_path, build_round, settings, monkeypatch):
+    live = backend(build_round, tmp_path)
+    ranking = live.start_round('round', settings)
+    vote = answer(ranking.get_next_pair())
+    def append(round_id, ranking, apply_votes, replay):
+        apply_votes()
+        raise OSError("disk full")
+    monkeypatch.setattr(live.journal, 'append', append)
+    with pytest.raises(OSError):
+        live.record_vote('round', ranking, *vote)
+    monkeypatch.undo()
+
+    # The live copy applied a vote the journal never got, so it is rebuilt
+    assert len(ranking.votes) == 1
+    recovered = live.load('round')
+    assert recovered is not ranking
+    assert len(recovered.votes) == 0
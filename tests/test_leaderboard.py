@@ -0,0 +1,39 @@
+import random
+
+from leaderboard import Leaderboard
+
+
+def test_top_pages_match_a_full_sort():
+    rng = random.Random(0)
+    names = [f"E{i:03d}" for i in range(60)]
+    board = Leaderboard(names)
+    for _ in range(300):
+        board.update(rng.choice(names), rng.randint(0, 12))
+
+    everyone = board.top()
+    assert sorted(everyone, key=lambda item: -item[1]) == everyone
+    assert sorted(everyone) == sorted(board.counts.items())
+    for limit in (1, 7, 25):
+        for offset in range(0, 70, 5):
+            assert board.top(limit, offset) == everyone[offset:offset + limit]
+    assert board.top(offset=len(names)) == []
+
+
+def test_updates_move_between_buckets():
+    board = Leaderboard(['a', 'b', 'c'])
+    board.update('b', 2)
+    board.update('c', 1)
+    board.update('a', 2)
+    assert board.top() == [('b', 2), ('a', 2), ('c', 1)]
+    board.update('b', 0)
+    assert board.top() == [('a', 2), ('c', 1), ('b', 0)]
+    assert board.keys == [0, 1, 2]
+    board.update('c', 2)
+    assert board.keys == [0, 2]
+    assert board['c'] == 2 and len(board) == 3
+
+
+def test_move_to_end_keeps_its_count():
+    board = Leaderboard(['a', 'b', 'c'])
+    board.move_to_end('a')
+    assert board.top() == [('b', 0), ('c', 0), ('a', 0)]
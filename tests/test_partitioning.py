@@ -0,0 +1,18 @@
+import random
+
+from closure import rebuild_closure
+from partitioning import PARALLEL_MIN_EMPLOYEES, get_pool, parallel_map
+
+
+def test_pooled_rebuilds_match_inline_and_reuse_one_pool():
+    rng = random.Random(0)
+    jobs = []
+    for _ in range(4):
+        size = 40
+        edges = [tuple(rng.sample(range(size), 2)) for _ in range(100)]
+        jobs.append((size, edges, 50))
+
+    inline = parallel_map(rebuild_closure, jobs, workers=1)
+    pooled = parallel_map(rebuild_closure, jobs, workers=2, total_size=PARALLEL_MIN_EMPLOYEES)
+    assert pooled == inline
+    assert get_pool(2) is get_pool(2)
@@ -0,0 +1,54 @@
+import random
+
+import numpy as np
+import pytest
+
+from rating import RATING_MODELS, BradleyTerry, RatingScheduler
+from storage import replay
+from support import random_votes
+
+
+def test_record_many_matches_record_vote_by_vote():
+    rng = random.Random(0)
+    size = 30
+    votes = [tuple(rng.sample(range(size), 2)) for _ in range(200)]
+    live, batched = BradleyTerry(size), BradleyTerry(size)
+    for winner, loser in votes:
+        live.record(winner, loser)
+    batched.record_many(*zip(*votes))
+    assert np.array_equal(live.log_strength, batched.log_strength)
+    assert np.array_equal(live.comparisons, batched.comparisons)
+
+
+def test_refit_orders_a_consistent_pool():
+    model = BradleyTerry(6)
+    for winner in range(6):
+        for loser in range(winner + 1, 6):
+            model.record(winner, loser)
+    model.refit()
+    assert [emp for emp, _ in model.ranked()] == list(range(6))
+
+
+@pytest.mark.parametrize('mode', list(RATING_MODELS))
+def test_replay_matches_live_scores(build_round, settings, mode):
+    live = build_round('live', dict(settings, mode=mode))
+    accepted = [vote for vote in random_votes(live, 200) if live.record_comparison(*vote)]
+
+    replayed = build_round('replayed', dict(settings, mode=mode))
+    replay(replayed, accepted)
+    assert replayed.get_rankings() == live.get_rankings()
+    assert replayed.version == live.version
+
+
+def test_scheduler_stops_at_the_budget():
+    model = BradleyTerry(16)
+    scheduler = RatingScheduler(model)
+    asked = []
+    while True:
+        pair = scheduler.next_pair()
+        if pair is None:
+            break
+        asked.append(frozenset(pair))
+        model.record(*pair)
+    assert len(asked) == len(set(asked))
+    assert model.comparisons.min() >= scheduler.budget or scheduler.exhausted.any()
@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+
+from roster import ROSTER_COLUMNS, load_roster
+
+ROWS = {
+    'Employee': [' Asha ', 'Ben', 'Chidi', 'Dana', 'Eli'],
+    'Job_Level': ['Senior', ' Junior', 'Senior', 'Mid-Level', 'Junior '],
+    'Experience': ['12', '2', '15', '6', '0'],
+    'Location': ['Kochi', 'Pune ', 'Kochi', 'Pune', 'Kochi'],
+}
+
+
+def test_sample_rows_are_normalised():
+    roster = load_roster(sample=ROWS)
+    assert list(roster.columns) == ROSTER_COLUMNS
+    assert roster['Employee'].tolist() == ['Asha', 'Ben', 'Chidi', 'Dana', 'Eli']
+    assert roster['Experience'].dtype == 'int16'
+    assert roster['Experience'].tolist() == [12, 2, 15, 6, 0]
+    assert roster['Job_Level'].dtype == 'category'
+    assert set(roster['Job_Level'].cat.categories) == {'Senior', 'Junior', 'Mid-Level'}
+    assert set(roster['Location'].cat.categories) == {'Kochi', 'Pune'}
+
+
+@pytest.mark.parametrize('suffix', ['csv', 'parquet'])
+def test_chunked_files_match_one_read(tmp_path, suffix):
+    path = str(tmp_path / f"roster.{suffix}")
+    frame = pd.DataFrame(ROWS)
+    if suffix == 'parquet':
+        pytest.importorskip('pyarrow')
+        frame.to_parquet(path)
+    else:
+        frame.to_csv(path, index=False)
+
+    chunked = load_roster(path, chunksize=2, cache_dir=None)
+    assert chunked.equals(load_roster(sample=ROWS))
+
+
+def test_parsed_roster_is_cached(tmp_path):
+    path = str(tmp_path / 'roster.csv')
+    pd.DataFrame(ROWS).to_csv(path, index=False)
+    cache_dir = str(tmp_path / 'cache')
+    first = load_roster(path, cache_dir=cache_dir)
+    assert len(list((tmp_path / 'cache').iterdir())) == 1
+    assert load_roster(path, cache_dir=cache_dir).equals(first)
+
+
+@pytest.mark.parametrize('suffix', ['csv', 'parquet'])
+def test_invalid_experience_names_file_rows(tmp_path, suffix):
+    rows = dict(ROWS, Experience=['12', '2', '3', '', 'x'])
+    path = str(tmp_path / f"roster.{suffix}")
+    frame = pd.DataFrame(rows)
+    if suffix == 'parquet':
+        pytest.importorskip('pyarrow')
+        frame.to_parquet(path)
+    else:
+        frame.to_csv(path, index=False)
+
+    # Both bad rows sit in the second chunk, so row numbers must run on across chunks
+    with pytest.raises(ValueError, match=r"rows 4 \(.*\), 5 \('x'\)"):
+        load_roster(path, chunksize=3, cache_dir=None)
+
+
+@pytest.mark.parametrize('value', ['1.5', '-1', '40000'])
+def test_experience_must_be_whole_years_in_range(value):
+    with pytest.raises(ValueError, match='row 2|rows 2'):
+        load_roster(sample=dict(ROWS, Experience=['1', value, '3', '4', '5']))
@@ -0,0 +1,75 @@
+import math
+import random
+
+from closure import TransitiveClosure
+from scheduling import InsertionScheduler, PairListScheduler
+
+
+def run(size, strength, batch=1):
+    """Answer every pair the scheduler asks by strength; returns (questions, closure)"""
+    closure = TransitiveClosure(size)
+    scheduler = InsertionScheduler(list(range(size)), closure)
+    questions = 0
+    while True:
+        pairs = scheduler.next_pairs(batch)
+        if not pairs:
+            return questions, closure, scheduler
+        for first, second in pairs:
+            winner, loser = (first, second) if strength[first] > strength[second] else (second, first)
+            closure.add(winner, loser)
+            questions += 1
+
+
+def test_binary_insertion_question_bound():
+    rng = random.Random(0)
+    for size in (1, 2, 5, 16, 50, 200):
+        strength = rng.sample(range(size), size)
+        questions, closure, scheduler = run(size, strength)
+        # Binary insertion never needs more than sum(ceil(log2 k)) questions
+        assert questions <= sum(math.ceil(math.log2(k)) for k in range(1, size + 1))
+        assert scheduler.ordered == sorted(range(size), key=lambda emp: -strength[emp])
+        assert all(closure.win_count(emp) == strength[emp] for emp in range(size))
+
+
+def test_batches_hold_one_undecided_pair_per_candidate():
+    rng = random.Random(1)
+    size = 60
+    strength = rng.sample(range(size), size)
+    closure = TransitiveClosure(size)
+    scheduler = InsertionScheduler(list(range(size)), closure)
+    while True:
+        pairs = scheduler.next_pairs(8)
+        if not pairs:
+            break
+        # Candidates are only ever paired with the ordered list, never each other
+        candidates = [first for first, _ in pairs]
+        assert len(set(candidates)) == len(candidates)
+        assert not set(candidates) & {second for _, second in pairs}
+        for first, second in pairs:
+            assert not closure.is_decided(first, second)
+            closure.add(*((first, second) if strength[first] > strength[second] else (second, first)))
+    assert scheduler.ordered == sorted(range(size), key=lambda emp: -strength[emp])
+
+
+def test_pair_list_batches_cannot_decide_each_other():
+    rng = random.Random(2)
+    size = 30
+    strength = rng.sample(range(size), size)
+    closure = TransitiveClosure(size)
+    # Experience neighbours first, like midpoint_pairs, then everything else
+    pairs = list(zip(range(size), range(1, size)))
+    pairs += rng.sample([(first, second) for first in range(size) for second in range(first + 2, size)],
+                        size * (size - 3) // 2 + 1)
+    scheduler = PairListScheduler(size, pairs, closure.is_decided, closure.related)
+    largest = 0
+    while True:
+        batch = scheduler.next_pairs(8)
+        if not batch:
+            break
+        largest = max(largest, len(batch))
+        # Answered in any order, no answer settles another pair of the batch
+        for first, second in reversed(batch):
+            assert not closure.is_decided(first, second)
+            closure.add(*((first, second) if strength[first] > strength[second] else (second, first)))
+    assert largest > 1
+    assert all(closure.win_count(emp) == strength[emp] for emp in range(size))
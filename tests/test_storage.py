@@ -0,0 +1,31 @@
+from storage import SQLiteBackend
+from support import random_votes, vote_by_experience
+
+
+def test_sqlite_workers_catch_up(tmp_path, build_round, settings):
+    path = str(tmp_path / 'rankings.db')
+    first, second = SQLiteBackend(build_round, path), SQLiteBackend(build_round, path)
+    ranking = first.start_round('round', settings)
+    assert second.load('round').get_rankings() == {}
+
+    votes = vote_by_experience(build_round('scratch', settings))
+    assert first.record_votes('round', ranking, votes) == votes
+
+    other = second.load('round')
+    assert other.applied_seq == len(votes)
+    assert other.get_rankings() == ranking.get_rankings()
+    assert other.version == ranking.version
+
+    # A vote through the second worker reaches the first on its next load
+    second.record_votes('round', other, random_votes(other, 50, seed=1))
+    assert first.load('round').get_rankings() == other.get_rankings()
+
+
+def test_sqlite_rounds_survive_a_new_backend(tmp_path, build_round, settings):
+    path = str(tmp_path / 'rankings.db')
+    backend = SQLiteBackend(build_round, path)
+    ranking = backend.start_round('round', settings)
+    backend.record_votes('round', ranking, vote_by_experience(build_round('scratch', settings)))
+
+    assert SQLiteBackend(build_round, path).load('round').get_rankings() == ranking.get_rankings()
+    assert SQLiteBackend(build_round, path).load('missing') is None